@@ -1,13 +1,18 @@
 """Entry point for python -m daily_briefing and the console script."""
 
+import os
 import sys
 
 from .cli import parse_args
 from .briefing import run_briefing
+from .runner import kill_children
+from .stream import stream_briefing
 from .formatters.terminal import format_terminal
 from .formatters.plain import format_plain
 from .formatters.json_fmt import format_json
 
+EXIT_TIMED_OUT = 124  # same as timeout(1), so cron wrappers can tell
+
 FORMATTERS = {
     "terminal": format_terminal,
     "plain": format_plain,
@@ -22,8 +27,20 @@ def main():
         print(f"Unknown format: {args.format}", file=sys.stderr)
         sys.exit(1)
 
-    results = run_briefing(args)
-    print(formatter(results))
+    if args.stream:
+        timed_out = stream_briefing(args)
+    else:
+        results = run_briefing(args)
+        print(formatter(results))
+        timed_out = bool(results["timedOut"])
+
+    if timed_out:
+        # Abandoned sections may still be blocked in worker pools that
+        # interpreter shutdown would join; kill the children they started
+        # and leave without waiting for them
+        sys.stdout.flush()
+        kill_children()
+        os._exit(EXIT_TIMED_OUT)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,18 @@
-"""Orchestrator — runs all sections concurrently."""
+"""Orchestrator — runs all sections concurrently on one asyncio event loop.
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+Async sections (``async def``) run as tasks on the loop; blocking ones run
+in their own daemon thread behind a future, so a hung one never has to be
+joined. A section that times out is cancelled or abandoned, and the child
+processes it started are killed on the spot.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
 from datetime import datetime, timezone
 
+from .runner import abandon_children, in_daemon_thread, own_children, set_process_limit
 from .sections.weather import get_weather
 from .sections.calendar import get_calendar
 from .sections.gitstatus import get_git_status
@@ -20,25 +30,83 @@ SECTION_RUNNERS = {
 }
 
 
-def run_briefing(args):
-    results = {}
+def _time_limit(args, name):
+    limits = [t for t in (args.deadline, args.section_timeouts.get(name)) if t is not None]
+    return min(limits) if limits else None
+
+
+async def _run_section(loop, name, args, owner):
+    own_children(owner)  # the task runs in its own context
+    runner = SECTION_RUNNERS.get(name)
+    if not runner:
+        return {"error": f"Unknown section: {name}"}
+    try:
+        if inspect.iscoroutinefunction(runner):
+            return await runner(args)
+        return await in_daemon_thread(loop, f"section-{name}", runner, args)
+    except Exception as e:
+        return {"error": str(e)}
+
 
-    def run_section(name):
-        runner = SECTION_RUNNERS.get(name)
-        if not runner:
-            return name, {"error": f"Unknown section: {name}"}
-        try:
-            return name, runner(args)
-        except Exception as e:
-            return name, {"error": str(e)}
-
-    with ThreadPoolExecutor(max_workers=len(args.sections)) as pool:
-        futures = {pool.submit(run_section, s): s for s in args.sections}
-        for future in as_completed(futures):
-            name, data = future.result()
-            results[name] = data
+def iter_briefing(args):
+    """Run the sections concurrently, yielding ``(name, data)`` as each finishes.
 
+    A section still running when its time limit (``--section-timeouts``,
+    capped by ``--deadline``) passes is yielded as ``{"timedOut": True}``:
+    async sections are cancelled, blocking ones abandoned, and the child
+    processes either started are killed.
+    """
+    set_process_limit(args.max_procs)
+    loop = asyncio.new_event_loop()
+    start = time.monotonic()
+    tasks = {}
+    for name in dict.fromkeys(args.sections):
+        limit = _time_limit(args, name)
+        owner = threading.Event()
+        task = loop.create_task(_run_section(loop, name, args, owner))
+        tasks[task] = (name, limit, start + limit if limit is not None else None, owner)
+
+    cancelled = []
+    try:
+        while tasks:
+            deadlines = [d for _, _, d, _ in tasks.values() if d is not None]
+            wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = loop.run_until_complete(
+                asyncio.wait(set(tasks), timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            )
+            for task in done:
+                name = tasks.pop(task)[0]
+                yield name, task.result()
+            now = time.monotonic()
+            for task, (name, limit, deadline, owner) in list(tasks.items()):
+                if deadline is not None and deadline <= now:
+                    del tasks[task]
+                    task.cancel()
+                    abandon_children(owner)
+                    cancelled.append(task)
+                    yield name, {"timedOut": True, "timeoutSeconds": limit}
+    finally:
+        # Let cancelled tasks unwind (close connections) before the loop goes
+        for _, _, _, owner in tasks.values():
+            abandon_children(owner)
+        cancelled += list(tasks)
+        for task in cancelled:
+            task.cancel()
+        if cancelled:
+            loop.run_until_complete(asyncio.gather(*cancelled, return_exceptions=True))
+        loop.close()
+
+
+def run_briefing(args):
+    """Collect every section; ``timedOut`` lists the sections that were abandoned."""
+    results = {}
+    timed_out = []
+    for name, data in iter_briefing(args):
+        results[name] = data
+        if data.get("timedOut"):
+            timed_out.append(name)
     return {
         "sections": results,
         "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timedOut": timed_out,
     }
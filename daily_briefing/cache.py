@@ -0,0 +1,43 @@
+"""On-disk cache shared by sections — lives under ~/.cache/daily-briefing."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def cache_dir():
+    """Resolve the cache directory (BRIEFING_CACHE_DIR, then XDG_CACHE_HOME)."""
+    env_dir = os.environ.get("BRIEFING_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg).expanduser() if xdg else Path.home() / ".cache"
+    return base / "daily-briefing"
+
+
+def load_json(name, default=None):
+    """Load a cached JSON document, returning ``default`` if missing or corrupt."""
+    try:
+        with open(cache_dir() / name) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(name, data):
+    """Atomically write a JSON document into the cache. Errors are ignored."""
+    path = cache_dir() / name
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        if tmp:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -6,7 +6,50 @@ from pathlib import Path
 
 DEFAULT_LOCATION = "Jeffersonton, VA 22724"
 DEFAULT_GIT_DIRS = os.environ.get("BRIEFING_GIT_DIRS", str(Path.home() / "git"))
+DEFAULT_GIT_IGNORE = os.environ.get("BRIEFING_GIT_IGNORE", "node_modules,venv,__pycache__")
 ALL_SECTIONS = ["weather", "calendar", "reminders", "git", "system", "kubernetes"]
+DURATION_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _positive_days(value):
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid day count {value!r}")
+    if days < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {days}")
+    return days
+
+
+def _windows(value):
+    """'1d,7d' -> [("1d", 86400), ("7d", 604800)]."""
+    windows = []
+    for label in (x.strip() for x in value.split(",")):
+        if not label:
+            continue
+        try:
+            seconds = float(label[:-1]) * DURATION_UNITS[label[-1]]
+        except (KeyError, ValueError):
+            raise argparse.ArgumentTypeError(f"invalid window {label!r} (use e.g. 12h, 1d, 2w)")
+        windows.append((label, seconds))
+    return windows
+
+
+def _section_timeouts(value):
+    """'git=30,kubernetes=10' -> {"git": 30.0, "kubernetes": 10.0}."""
+    timeouts = {}
+    for item in (x.strip() for x in value.split(",")):
+        if not item:
+            continue
+        name, _, seconds = item.partition("=")
+        name = name.strip()
+        if name not in ALL_SECTIONS:
+            raise argparse.ArgumentTypeError(f"unknown section {name!r}")
+        try:
+            timeouts[name] = float(seconds)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid timeout {item!r} (use e.g. git=30)")
+    return timeouts
 
 
 def parse_args(argv=None):
@@ -20,12 +63,37 @@ def parse_args(argv=None):
         default="terminal",
         help="Output format (default: terminal)",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print each section as soon as it finishes (NDJSON lines with --format json)",
+    )
     parser.add_argument(
         "--sections",
         type=lambda s: [x.strip() for x in s.split(",")],
         default=ALL_SECTIONS,
         help="Comma-separated sections to include (default: all)",
     )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Print whatever has finished after this many seconds and exit; the rest are marked timed out",
+    )
+    parser.add_argument(
+        "--section-timeouts",
+        type=_section_timeouts,
+        default={},
+        metavar="NAME=SECONDS,...",
+        help="Per-section time limits, e.g. git=30,kubernetes=10 (the deadline still applies)",
+    )
+    parser.add_argument(
+        "--max-procs",
+        type=int,
+        default=32,
+        help="Max child processes (git, kubectl) running at once across all sections (default: 32)",
+    )
     parser.add_argument(
         "--location",
         default=os.environ.get("BRIEFING_LOCATION", DEFAULT_LOCATION),
@@ -37,4 +105,146 @@ def parse_args(argv=None):
         default=[d.strip() for d in DEFAULT_GIT_DIRS.split(",")],
         help="Comma-separated directories to scan for git repos",
     )
+    parser.add_argument(
+        "--git-depth",
+        type=int,
+        default=3,
+        help="How many directory levels below each git dir to search for repos (default: 3)",
+    )
+    parser.add_argument(
+        "--git-ignore",
+        type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+        default=[p.strip() for p in DEFAULT_GIT_IGNORE.split(",") if p.strip()],
+        help="Comma-separated name/path globs to skip while searching for repos",
+    )
+    parser.add_argument(
+        "--git-jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Max git repos to scan concurrently (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--git-large-repo",
+        type=int,
+        default=100_000,
+        help="Index entries at which a repo gets fast status without untracked files (default: 100000)",
+    )
+    parser.add_argument(
+        "--git-status-timeout",
+        type=float,
+        default=10,
+        help="Seconds before a repo's git status is abandoned (default: 10)",
+    )
+    parser.add_argument(
+        "--git-branches",
+        action="store_true",
+        help="Report every local branch's tracking state and stash counts per repo",
+    )
+    parser.add_argument(
+        "--git-stale-days",
+        type=float,
+        default=30,
+        help="Days without commits before a branch counts as stale (default: 30)",
+    )
+    parser.add_argument(
+        "--git-fetch",
+        action="store_true",
+        help="Fetch each repo's upstream before computing ahead/behind",
+    )
+    parser.add_argument(
+        "--git-fetch-jobs",
+        type=int,
+        default=8,
+        help="Max concurrent git fetches (default: 8)",
+    )
+    parser.add_argument(
+        "--git-fetch-timeout",
+        type=float,
+        default=30,
+        help="Seconds before a single repo's fetch is abandoned (default: 30)",
+    )
+    parser.add_argument(
+        "--git-fetch-budget",
+        type=float,
+        default=60,
+        help="Overall seconds allowed for fetching; later repos are reported stale (default: 60)",
+    )
+    parser.add_argument(
+        "--git-cache-ttl",
+        type=float,
+        default=3600,
+        help="Seconds cached git ref data (branch, ahead/behind, recent commits) stays valid (default: 3600)",
+    )
+    parser.add_argument(
+        "--days",
+        type=_positive_days,
+        default=1,
+        help="Days of calendar agenda to show, starting today (default: 1)",
+    )
+    parser.add_argument(
+        "--calendar-refresh",
+        type=float,
+        default=300,
+        help="Seconds a synced calendar store is used without contacting Google (default: 300)",
+    )
+    parser.add_argument(
+        "--system-sample",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Sample CPU (total and per core), disk I/O and pressure stalls over this window (default: off)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Show the top N processes by memory and by CPU (CPU measured over at least 1s; default: off)",
+    )
+    parser.add_argument(
+        "--disk-timeout",
+        type=float,
+        default=2,
+        help="Seconds to wait for each mount's statvfs before reporting it unresponsive (default: 2)",
+    )
+    parser.add_argument(
+        "--history-windows",
+        type=_windows,
+        default=_windows("1d,7d"),
+        metavar="WINDOWS",
+        help="Comma-separated windows to compare system metrics against, e.g. 12h,1d,2w (default: 1d,7d)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Don't record system metrics history or report trends",
+    )
+    parser.add_argument(
+        "--kube-mode",
+        choices=["auto", "api", "kubectl"],
+        default="auto",
+        help="How to query Kubernetes: built-in API client, kubectl, or API with kubectl fallback (default: auto)",
+    )
+    parser.add_argument(
+        "--kube-contexts",
+        type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+        default=None,
+        help="Comma-separated kubeconfig contexts to query concurrently, or 'all'",
+    )
+    parser.add_argument(
+        "--kube-timeout",
+        type=float,
+        default=15,
+        help="Seconds to wait for each cluster (default: 15)",
+    )
+    parser.add_argument(
+        "--kube-cache",
+        action="store_true",
+        help="Keep pod and node lists on disk and catch up with a short watch instead of listing everything",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and don't update the on-disk cache (~/.cache/daily-briefing)",
+    )
     return parser.parse_args(argv)
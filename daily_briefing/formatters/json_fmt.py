@@ -5,3 +5,8 @@ import json
 
 def format_json(results):
     return json.dumps(results, indent=2)
+
+
+def format_json_line(name, data):
+    """One NDJSON line for a single finished section."""
+    return json.dumps({"section": name, "data": data}, separators=(",", ":"))
@@ -3,6 +3,20 @@
 from datetime import datetime
 
 
+SECTION_TITLES = {
+    "weather": "🌤️ Weather",
+    "calendar": "📅 Calendar",
+    "reminders": "📝 Reminders",
+    "git": "📦 Git Status",
+    "system": "🖥️ System Health",
+    "kubernetes": "☸️ Kubernetes",
+}
+
+
+def _fmt_timed_out(key, data):
+    return f"{SECTION_TITLES[key]}\nTimed out after {data['timeoutSeconds']:g}s"
+
+
 def _fmt_weather(data):
     if data.get("error"):
         return f"🌤️ Weather\nError: {data['error']}"
@@ -16,19 +30,32 @@ def _fmt_weather(data):
     ])
 
 
+def _day_label(iso_date):
+    day = datetime.strptime(iso_date, "%Y-%m-%d")
+    today = datetime.now().date()
+    if day.date() == today:
+        return "Today"
+    return f"{day:%A, %b} {day.day}"
+
+
 def _fmt_calendar(data):
     if not data.get("available"):
         return f"📅 Calendar\n{data.get('note', 'Not configured')}"
     if data.get("error"):
         return f"📅 Calendar\nError: {data['error']}"
-    events = data.get("events", [])
-    if not events:
-        return "📅 Calendar\nNo events today — wide open!"
-    count = data.get("count", len(events))
+    days = data.get("days", [])
+    window = data.get("windowDays", 1)
+    if not days:
+        when = "today" if window == 1 else f"in the next {window} days"
+        return f"📅 Calendar\nNo events {when} — wide open!"
+    count = data["count"]
     lines = [f"📅 Calendar — {count} event{'s' if count != 1 else ''}"]
-    for e in events:
-        loc = f" @ {e['location']}" if e.get("location") else ""
-        lines.append(f"  {e['start_time']} — {e['title']}{loc}")
+    for day in days:
+        if window > 1:
+            lines.append(_day_label(day["date"]))
+        for e in day["events"]:
+            loc = f" @ {e['location']}" if e.get("location") else ""
+            lines.append(f"  {e['start_time']} — {e['title']}{loc}")
     return "\n".join(lines)
 
 
@@ -55,14 +82,22 @@ def _fmt_git(data):
         lines.append(f"⚠ {data['dirtyRepos']} with uncommitted changes")
     if data["reposWithRecentCommits"] > 0:
         lines.append(f"✓ {data['reposWithRecentCommits']} with recent commits")
+    if data.get("staleRepos", 0) > 0:
+        lines.append(f"⟳ {data['staleRepos']} could not be fetched")
+    if data.get("statusTimeouts", 0) > 0:
+        lines.append(f"⏱ {data['statusTimeouts']} with git status timed out")
 
     interesting = [
         r for r in data["repos"]
-        if r["uncommitted"] > 0 or r.get("ahead", 0) > 0 or r.get("behind", 0) > 0 or r["recentCommits"] > 0
+        if (r["uncommitted"] or 0) > 0 or r.get("ahead", 0) > 0 or r.get("behind", 0) > 0 or r["recentCommits"] > 0
+        or r.get("stale") or r.get("statusTimedOut")
+        or r.get("goneBranches", 0) > 0 or r.get("staleBranches", 0) > 0 or r.get("stashes", 0) > 0
     ]
     for r in interesting:
         flags = []
-        if r["uncommitted"] > 0:
+        if r.get("statusTimedOut"):
+            flags.append("status timed out")
+        if (r["uncommitted"] or 0) > 0:
             flags.append(f"{r['uncommitted']} uncommitted")
         if r.get("ahead", 0) > 0:
             flags.append(f"↑{r['ahead']}")
@@ -70,6 +105,14 @@ def _fmt_git(data):
             flags.append(f"↓{r['behind']}")
         if r["recentCommits"] > 0:
             flags.append(f"{r['recentCommits']} recent")
+        if r.get("stale"):
+            flags.append("stale")
+        if r.get("goneBranches", 0) > 0:
+            flags.append(f"{r['goneBranches']} gone")
+        if r.get("staleBranches", 0) > 0:
+            flags.append(f"{r['staleBranches']} stale branches")
+        if r.get("stashes", 0) > 0:
+            flags.append(f"{r['stashes']} stashed")
         lines.append(f"  {r['name']} ({r['branch']}) — {', '.join(flags)}")
 
     if not interesting and data["dirtyRepos"] == 0:
@@ -86,11 +129,37 @@ def _fmt_system(data):
         f"Load: {data['load']['1m']} / {data['load']['5m']} / {data['load']['15m']}",
         f"Memory: {data['memory']['percent']}% ({data['memory']['used_gb']}/{data['memory']['total_gb']} GB)",
     ]
+    cpu = data.get("cpu", {})
+    if "percent" in cpu:
+        line = f"CPU: {cpu['percent']}% over {cpu['sampleSeconds']}s"
+        cores = cpu.get("cores")
+        if cores and cores["count"] > 1:
+            line += f" (cores {cores['min']}/{cores['median']}/{cores['max']}%, {cores['hotCount']} hot)"
+        lines.append(line)
+    pressure = data.get("pressure", {})
+    if pressure:
+        lines.append("Pressure (avg10): " + ", ".join(f"{r} {p['some']['avg10']}%" for r, p in pressure.items() if "some" in p))
+    top = data.get("topProcesses")
+    if top:
+        lines.append("Top memory: " + ", ".join(f"{p['name']} {p['rss']}" for p in top["byMemory"]))
+        lines.append("Top CPU: " + ", ".join(f"{p['name']} {p['cpuPercent']}%" for p in top["byCpu"]))
+    for label, trend in data.get("history", {}).get("windows", {}).items():
+        parts = []
+        if "loadRatio" in trend:
+            parts.append(f"load {trend['loadRatio']}x median ({trend['loadMedian']})")
+        if trend.get("memoryPercentDelta"):
+            parts.append(f"memory {trend['memoryPercentDelta']:+}%")
+        parts += [f"{d['mount']} {d['percentDelta']:+}%" for d in trend["disks"] if d["percentDelta"]]
+        if parts:
+            lines.append(f"Trend vs {label}: " + ", ".join(parts))
     disks = data.get("disks", [])
     warns = [d for d in disks if d.get("warning")]
     if warns:
         for d in warns:
-            lines.append(f"⚠️ Disk {d['mount']}: {d['percent']}% ({d['used']}/{d['size']})")
+            if d.get("unresponsive"):
+                lines.append(f"⚠️ Disk {d['mount']}: unresponsive")
+            else:
+                lines.append(f"⚠️ Disk {d['mount']}: {d['percent']}% ({d['used']}/{d['size']})")
     else:
         lines.append("Disks: All healthy")
     return "\n".join(lines)
@@ -102,6 +171,9 @@ def _fmt_k8s(data):
     if data.get("error"):
         return f"☸️ Kubernetes\nError: {data['error']}"
 
+    if "clusters" in data:
+        return _fmt_k8s_fleet(data)
+
     lines = ["☸️ Kubernetes"]
     if data.get("nodes"):
         lines.append(f"Nodes: {data['nodesReady']}/{data['nodeCount']} ready")
@@ -122,25 +194,64 @@ def _fmt_k8s(data):
     return "\n".join(lines)
 
 
-def format_plain(results):
+def _fmt_k8s_fleet(data):
+    n = data["clusterCount"]
+    lines = [
+        f"☸️ Kubernetes — {n} cluster{'s' if n != 1 else ''}",
+        f"Fleet: {data['clustersReachable']}/{n} reachable | {data['totalPods']} pods",
+    ]
+    if data["unhealthyCount"] > 0:
+        lines.append(f"⚠ {data['unhealthyCount']} unhealthy pods fleet-wide")
+    if data["restartIssueCount"] > 0:
+        lines.append(f"🔄 {data['restartIssueCount']} restart loops fleet-wide")
+
+    for c in data["clusters"]:
+        if c.get("error"):
+            lines.append(f"  {c['context']}: Error: {c['error']}")
+            continue
+        if not c.get("available"):
+            lines.append(f"  {c['context']}: {c.get('note', 'Not available')}")
+            continue
+        summary = []
+        if c.get("nodes"):
+            summary.append(f"{c['nodesReady']}/{c['nodeCount']} nodes ready")
+        summary.append(f"{c['totalPods']} pods")
+        if c.get("unhealthyCount", 0) > 0:
+            summary.append(f"{c['unhealthyCount']} unhealthy")
+        if c.get("restartIssueCount", 0) > 0:
+            summary.append(f"{c['restartIssueCount']} restarting")
+        lines.append(f"  {c['context']}: {' | '.join(summary)}")
+
+    return "\n".join(lines)
+
+
+SECTION_FORMATTERS = {
+    "weather": _fmt_weather,
+    "calendar": _fmt_calendar,
+    "reminders": _fmt_reminders,
+    "git": _fmt_git,
+    "system": _fmt_system,
+    "kubernetes": _fmt_k8s,
+}
+
+
+def format_banner():
     now = datetime.now()
     date_str = now.strftime("%A, %B %d, %Y")
     time_str = now.strftime("%I:%M %p").lstrip("0")
+    return f"☀️ DAILY BRIEFING — {date_str} {time_str}\n"
+
+
+def format_section(key, data):
+    """Render one section's result (``key`` must be in SECTION_FORMATTERS)."""
+    text = _fmt_timed_out(key, data) if data.get("timedOut") else SECTION_FORMATTERS[key](data)
+    return text + "\n"
 
-    parts = [f"☀️ DAILY BRIEFING — {date_str} {time_str}", ""]
 
+def format_plain(results):
+    parts = [format_banner()]
     s = results["sections"]
-    for key in ["weather", "calendar", "reminders", "git", "system", "kubernetes"]:
+    for key in SECTION_FORMATTERS:
         if key in s:
-            formatter = {
-                "weather": _fmt_weather,
-                "calendar": _fmt_calendar,
-                "reminders": _fmt_reminders,
-                "git": _fmt_git,
-                "system": _fmt_system,
-                "kubernetes": _fmt_k8s,
-            }[key]
-            parts.append(formatter(s[key]))
-            parts.append("")
-
+            parts.append(format_section(key, s[key]))
     return "\n".join(parts)
@@ -19,6 +19,21 @@ def _header(emoji, title):
     return f"\n{BOLD}{CYAN}{emoji}  {title}{RESET}\n{'─' * 50}"
 
 
+SECTION_TITLES = {
+    "weather": ("🌤️", "Weather"),
+    "calendar": ("📅", "Calendar"),
+    "reminders": ("📝", "Reminders"),
+    "git": ("📦", "Git Status"),
+    "system": ("🖥️", "System Health"),
+    "kubernetes": ("☸️", "Kubernetes"),
+}
+
+
+def _fmt_timed_out(key, data):
+    emoji, title = SECTION_TITLES[key]
+    return f"{_header(emoji, title)}\n  {YELLOW}⏱️  Timed out after {data['timeoutSeconds']:g}s{RESET}"
+
+
 def _fmt_weather(data):
     if data.get("error"):
         return f"{_header('🌤️', 'Weather')}\n  {RED}Error: {data['error']}{RESET}"
@@ -32,19 +47,32 @@ def _fmt_weather(data):
     ])
 
 
+def _day_label(iso_date):
+    day = datetime.strptime(iso_date, "%Y-%m-%d")
+    today = datetime.now().date()
+    if day.date() == today:
+        return "Today"
+    return f"{day:%A, %b} {day.day}"
+
+
 def _fmt_calendar(data):
     if data.get("error"):
         return f"{_header('📅', 'Calendar')}\n  {RED}Error: {data['error']}{RESET}"
     if not data.get("available"):
         return f"{_header('📅', 'Calendar')}\n  {DIM}{data.get('note', 'Not configured')}{RESET}"
-    events = data.get("events", [])
-    if not events:
-        return f"{_header('📅', 'Calendar')}\n  {GREEN}No events today — wide open!{RESET}"
-    count = data.get("count", len(events))
+    days = data.get("days", [])
+    window = data.get("windowDays", 1)
+    if not days:
+        when = "today" if window == 1 else f"in the next {window} days"
+        return f"{_header('📅', 'Calendar')}\n  {GREEN}No events {when} — wide open!{RESET}"
+    count = data["count"]
     lines = [_header("📅", f"Calendar — {count} event{'s' if count != 1 else ''}")]
-    for e in events:
-        loc = f"  {DIM}@ {e['location']}{RESET}" if e.get("location") else ""
-        lines.append(f"  {BOLD}{e['start_time']}{RESET} {e['title']}{loc}")
+    for day in days:
+        if window > 1:
+            lines.append(f"  {CYAN}{_day_label(day['date'])}{RESET}")
+        for e in day["events"]:
+            loc = f"  {DIM}@ {e['location']}{RESET}" if e.get("location") else ""
+            lines.append(f"  {BOLD}{e['start_time']}{RESET} {e['title']}{loc}")
     return "\n".join(lines)
 
 
@@ -73,16 +101,26 @@ def _fmt_git(data):
     if data["reposWithRecentCommits"] > 0:
         n = data["reposWithRecentCommits"]
         lines.append(f"  {GREEN}✓ {n} repo{'s' if n > 1 else ''} with commits in last 24h{RESET}")
+    if data.get("staleRepos", 0) > 0:
+        n = data["staleRepos"]
+        lines.append(f"  {DIM}⟳ {n} repo{'s' if n > 1 else ''} could not be fetched — counts may be stale{RESET}")
+    if data.get("statusTimeouts", 0) > 0:
+        n = data["statusTimeouts"]
+        lines.append(f"  {RED}⏱ {n} repo{'s' if n > 1 else ''} with git status timed out — uncommitted count unknown{RESET}")
 
     interesting = [
         r for r in data["repos"]
-        if r["uncommitted"] > 0 or r.get("ahead", 0) > 0 or r.get("behind", 0) > 0 or r["recentCommits"] > 0
+        if (r["uncommitted"] or 0) > 0 or r.get("ahead", 0) > 0 or r.get("behind", 0) > 0 or r["recentCommits"] > 0
+        or r.get("stale") or r.get("statusTimedOut")
+        or r.get("goneBranches", 0) > 0 or r.get("staleBranches", 0) > 0 or r.get("stashes", 0) > 0
     ]
     if interesting:
         lines.append("")
         for r in interesting:
             flags = []
-            if r["uncommitted"] > 0:
+            if r.get("statusTimedOut"):
+                flags.append(f"{RED}status timed out{RESET}")
+            if (r["uncommitted"] or 0) > 0:
                 flags.append(f"{YELLOW}{r['uncommitted']} uncommitted{RESET}")
             if r.get("ahead", 0) > 0:
                 flags.append(f"{GREEN}↑{r['ahead']}{RESET}")
@@ -90,7 +128,22 @@ def _fmt_git(data):
                 flags.append(f"{RED}↓{r['behind']}{RESET}")
             if r["recentCommits"] > 0:
                 flags.append(f"{CYAN}{r['recentCommits']} recent{RESET}")
+            if r.get("stale"):
+                flags.append(f"{DIM}stale{RESET}")
+            if r.get("goneBranches", 0) > 0:
+                flags.append(f"{RED}{r['goneBranches']} gone{RESET}")
+            if r.get("staleBranches", 0) > 0:
+                flags.append(f"{DIM}{r['staleBranches']} stale branches{RESET}")
+            if r.get("stashes", 0) > 0:
+                flags.append(f"{YELLOW}{r['stashes']} stashed{RESET}")
             lines.append(f"  {BOLD}{r['name']}{RESET} ({r['branch']}) — {', '.join(flags)}")
+            attention = [
+                b for b in r.get("branches", [])
+                if b["name"] != r["branch"] and (b["gone"] or b["ahead"] > 0)
+            ]
+            for b in attention[:5]:
+                state = "upstream gone" if b["gone"] else f"↑{b['ahead']} unpushed"
+                lines.append(f"     {DIM}{b['name']}: {state}{RESET}")
 
     if data.get("errors"):
         for e in data["errors"]:
@@ -117,9 +170,56 @@ def _fmt_system(data):
         f"  🧠 Memory: {mem_color}{mem['percent']}%{RESET} ({mem['used_gb']}/{mem['total_gb']} GB)",
     ]
 
+    cpu = data.get("cpu", {})
+    if "percent" in cpu:
+        c_color = RED if cpu["percent"] > 90 else YELLOW if cpu["percent"] > 70 else GREEN
+        line = f"  ⚙️  CPU: {c_color}{cpu['percent']}%{RESET} over {cpu['sampleSeconds']}s"
+        cores = cpu.get("cores")
+        if cores and cores["count"] > 1:
+            line += f"  {DIM}cores min/median/max {cores['min']}/{cores['median']}/{cores['max']}%{RESET}"
+            if cores["hotCount"]:
+                ids = ",".join(str(i) for i in cores["hot"])
+                more = "…" if cores["hotCount"] > len(cores["hot"]) else ""
+                line += f"  {RED}{cores['hotCount']} hot ({ids}{more}){RESET}"
+        lines.append(line)
+    pressure = data.get("pressure", {})
+    if pressure:
+        stalls = [f"{r} {p['some']['avg10']}%" for r, p in pressure.items() if "some" in p]
+        lines.append(f"  ⏳ Pressure (avg10): {', '.join(stalls)}")
+    busy = [d for d in data.get("diskIO", []) if d["readBytesPerSec"] or d["writeBytesPerSec"]]
+    if busy:
+        io = ", ".join(f"{d['device']} ↓{d['read']} ↑{d['write']}" for d in busy)
+        lines.append(f"  💽 Disk I/O: {io}")
+
+    top = data.get("topProcesses")
+    if top:
+        lines.append(f"  🔝 Top processes {DIM}({top['scanned']} scanned){RESET}")
+        mem = ", ".join(f"{p['name']} {DIM}[{p['pid']}]{RESET} {p['rss']}" for p in top["byMemory"])
+        cpu = ", ".join(f"{p['name']} {DIM}[{p['pid']}]{RESET} {p['cpuPercent']}%" for p in top["byCpu"])
+        lines.append(f"     Memory: {mem}")
+        lines.append(f"     CPU: {cpu}")
+
+    for label, trend in data.get("history", {}).get("windows", {}).items():
+        parts = []
+        if "loadRatio" in trend:
+            ratio = trend["loadRatio"]
+            r_color = RED if ratio >= 3 else YELLOW if ratio >= 1.5 else GREEN
+            parts.append(f"load {r_color}{ratio}×{RESET} median ({trend['loadMedian']})")
+        if trend.get("memoryPercentDelta"):
+            parts.append(f"memory {trend['memoryPercentDelta']:+}%")
+        for d in trend["disks"]:
+            if d["percentDelta"]:
+                d_color = YELLOW if d["percentDelta"] > 0 else GREEN
+                parts.append(f"{d['mount']} {d_color}{d['percentDelta']:+}%{RESET}")
+        if parts:
+            lines.append(f"  📈 vs {label} {DIM}({trend['samples']} runs){RESET}: {', '.join(parts)}")
+
     if data.get("disks"):
         lines.append("  💾 Disks:")
         for d in data["disks"]:
+            if d.get("unresponsive"):
+                lines.append(f"     {d['mount']}: {RED}unresponsive{RESET} ⚠️")
+                continue
             d_color = RED if d["warning"] else GREEN
             warn = " ⚠️" if d["warning"] else ""
             lines.append(f"     {d['mount']}: {d_color}{d['percent']}%{RESET} ({d['used']}/{d['size']}){warn}")
@@ -133,6 +233,9 @@ def _fmt_k8s(data):
     if not data.get("available"):
         return f"{_header('☸️', 'Kubernetes')}\n  {DIM}{data.get('note', 'Not available')}{RESET}"
 
+    if "clusters" in data:
+        return _fmt_k8s_fleet(data)
+
     lines = [_header("☸️", "Kubernetes")]
 
     if data.get("nodes"):
@@ -157,30 +260,97 @@ def _fmt_k8s(data):
         for r in data["restartIssues"][:10]:
             lines.append(f"     {YELLOW}{r['namespace']}/{r['pod']}:{r['container']} ({r['restarts']} restarts){RESET}")
 
+    namespaces = data.get("namespaces") or {}
+    if len(namespaces) > 1:
+        worst = sorted(namespaces.items(), key=lambda kv: -(kv[1]["unhealthy"] + kv[1]["restartIssues"]))
+        summary = ", ".join(f"{ns} ({t['unhealthy'] + t['restartIssues']})" for ns, t in worst[:5])
+        lines.append(f"  {DIM}By namespace: {summary}{RESET}")
+
     return "\n".join(lines)
 
 
-def format_terminal(results):
+def _fmt_k8s_fleet(data):
+    n = data["clusterCount"]
+    lines = [_header("☸️", f"Kubernetes — {n} cluster{'s' if n != 1 else ''}")]
+
+    reach = data["clustersReachable"]
+    reach_color = GREEN if reach == n else RED
+    lines.append(
+        f"  🌐 Fleet: {reach_color}{reach}/{n} reachable{RESET}  |  📦 {data['totalPods']} pods"
+    )
+    if data["unhealthyCount"] > 0:
+        lines.append(f"  {RED}⚠ {data['unhealthyCount']} unhealthy pods fleet-wide{RESET}")
+    if data["restartIssueCount"] > 0:
+        lines.append(f"  {YELLOW}🔄 {data['restartIssueCount']} restart loops fleet-wide{RESET}")
+
+    for c in data["clusters"]:
+        name = f"{BOLD}{c['context']}{RESET}"
+        if c.get("error"):
+            lines.append(f"  {name}: {RED}Error: {c['error']}{RESET}")
+            continue
+        if not c.get("available"):
+            lines.append(f"  {name}: {DIM}{c.get('note', 'Not available')}{RESET}")
+            continue
+        summary = []
+        if c.get("nodes"):
+            color = GREEN if c["nodesReady"] == c["nodeCount"] else RED
+            summary.append(f"{color}{c['nodesReady']}/{c['nodeCount']} nodes ready{RESET}")
+        summary.append(f"{c['totalPods']} pods")
+        if c.get("unhealthyCount", 0) > 0:
+            summary.append(f"{RED}{c['unhealthyCount']} unhealthy{RESET}")
+        if c.get("restartIssueCount", 0) > 0:
+            summary.append(f"{YELLOW}{c['restartIssueCount']} restarting{RESET}")
+        if not c.get("unhealthyCount") and not c.get("restartIssueCount"):
+            summary.append(f"{GREEN}✓ healthy{RESET}")
+        lines.append(f"  {name}: {' | '.join(summary)}")
+        for p in c.get("unhealthyPods", [])[:3]:
+            lines.append(f"     {RED}{p['namespace']}/{p['name']} ({p['phase']}){RESET}")
+        for r in c.get("restartIssues", [])[:3]:
+            lines.append(f"     {YELLOW}{r['namespace']}/{r['pod']}:{r['container']} ({r['restarts']} restarts){RESET}")
+
+    return "\n".join(lines)
+
+
+SECTION_FORMATTERS = {
+    "weather": _fmt_weather,
+    "calendar": _fmt_calendar,
+    "reminders": _fmt_reminders,
+    "git": _fmt_git,
+    "system": _fmt_system,
+    "kubernetes": _fmt_k8s,
+}
+
+
+def format_banner():
     now = datetime.now()
     date_str = now.strftime("%A, %B %d, %Y")
     time_str = now.strftime("%I:%M %p").lstrip("0")
+    return f"\n{BOLD}{BG_BLUE}{WHITE} ☀️  DAILY BRIEFING — {date_str} {time_str} {RESET}\n"
 
-    parts = [
-        f"\n{BOLD}{BG_BLUE}{WHITE} ☀️  DAILY BRIEFING — {date_str} {time_str} {RESET}\n",
-    ]
 
+def format_section(key, data):
+    """Render one section's result (``key`` must be in SECTION_FORMATTERS)."""
+    if data.get("timedOut"):
+        return _fmt_timed_out(key, data)
+    return SECTION_FORMATTERS[key](data)
+
+
+def format_placeholder(key, ready=False):
+    """One-line stand-in for a section while streaming."""
+    emoji, title = SECTION_TITLES[key]
+    state = f"{GREEN}✓ ready{RESET}" if ready else f"{DIM}⏳ waiting…{RESET}"
+    return f"{BOLD}{CYAN}{emoji}  {title}{RESET}  {state}"
+
+
+def format_footer(timestamp):
+    return f"\n{DIM}Generated at {timestamp}{RESET}\n"
+
+
+def format_terminal(results):
+    parts = [format_banner()]
     s = results["sections"]
-    for key in ["weather", "calendar", "reminders", "git", "system", "kubernetes"]:
+    for key in SECTION_FORMATTERS:
         if key in s:
-            formatter = {
-                "weather": _fmt_weather,
-                "calendar": _fmt_calendar,
-                "reminders": _fmt_reminders,
-                "git": _fmt_git,
-                "system": _fmt_system,
-                "kubernetes": _fmt_k8s,
-            }[key]
-            parts.append(formatter(s[key]))
-
-    parts.append(f"\n{DIM}Generated at {results['timestamp']}{RESET}\n")
+            parts.append(format_section(key, s[key]))
+    parts.append(format_footer(results["timestamp"]))
     return "\n".join(parts)
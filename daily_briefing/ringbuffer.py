@@ -0,0 +1,99 @@
+"""Fixed-size ring of fixed-width records in one memory-mapped file.
+
+Appends overwrite the oldest record once the ring is full, so the file
+never grows and an append is a single ``pack_into`` plus a header update.
+The first field of every record must be a timestamp, which is what
+``since()`` searches on.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+
+MAGIC = b"DBRB"
+HEADER = struct.Struct("<4sHHIQ")  # magic, version, record size, capacity, records ever written
+HEADER_SIZE = 64
+VERSION = 1
+
+
+class RingBuffer:
+    """Use as a context manager; the file is locked while it is open."""
+
+    def __init__(self, path, record, capacity):
+        self.path = path
+        self.record = record
+        self.capacity = capacity
+        self.size = HEADER_SIZE + record.size * capacity
+        self._fd = None
+        self._mm = None
+        self.written = 0
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            header = os.pread(self._fd, HEADER.size, 0)
+            expected = (MAGIC, VERSION, self.record.size, self.capacity)
+            if len(header) < HEADER.size or HEADER.unpack(header)[:4] != expected or os.fstat(self._fd).st_size != self.size:
+                # New file, or one written with another layout — start over.
+                # Truncating leaves the file sparse until records are written.
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self.size)
+                os.pwrite(self._fd, HEADER.pack(*expected, 0), 0)
+            self._mm = mmap.mmap(self._fd, self.size)
+            self.written = HEADER.unpack_from(self._mm)[4]
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)  # also drops the flock
+            self._fd = None
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def _offset(self, k):
+        """Byte offset of the ``k``-th oldest record still in the ring."""
+        first = self.written - len(self)
+        return HEADER_SIZE + ((first + k) % self.capacity) * self.record.size
+
+    def append(self, values):
+        slot = self.written % self.capacity  # the oldest record once the ring is full
+        self.record.pack_into(self._mm, HEADER_SIZE + slot * self.record.size, *values)
+        self.written += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self.record.size, self.capacity, self.written)
+
+    def since(self, timestamp):
+        """Records with a timestamp >= ``timestamp``, oldest first.
+
+        The start is found by binary search; the records are then unpacked
+        straight out of at most two slices of the map (before and after
+        the wrap point), without copying the bytes first.
+        """
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record.unpack_from(self._mm, self._offset(mid))[0] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        count = len(self) - lo
+        if not count:
+            return []
+        start = self._offset(lo)
+        end = start + count * self.record.size
+        limit = HEADER_SIZE + self.capacity * self.record.size
+        with memoryview(self._mm) as view:
+            if end <= limit:
+                return list(self.record.iter_unpack(view[start:end]))
+            return list(self.record.iter_unpack(view[start:limit])) + list(
+                self.record.iter_unpack(view[HEADER_SIZE:HEADER_SIZE + end - limit])
+            )
@@ -0,0 +1,221 @@
+"""Shared runners for child processes and HTTP, used by every section.
+
+All child processes started through ``run`` or ``process_slot`` count
+against one process-wide limit (``--max-procs``), however many sections
+and worker threads are spawning them at once. Children registered with
+``tracked`` can be killed in one go by ``kill_children`` when the
+briefing gives up on the sections that started them, or per section: each
+section runs as the owner of the children it starts (``own_children``,
+carried into its worker threads by ``carry_children``), and
+``abandon_children`` kills them and refuses that owner any new ones.
+
+``in_daemon_thread`` lets blocking work be awaited on the orchestrator's
+event loop without ever being joined; ``get_json``, the HTTP client of
+the sections that run on that loop, is built on it.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import signal
+import subprocess
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+TIMED_OUT = "timed out"
+HTTP_LIMIT = 16 * 1024 * 1024  # largest response body get_json accepts
+
+_slots = threading.BoundedSemaphore(32)
+_owner = contextvars.ContextVar("owner", default=None)
+
+
+def set_process_limit(n):
+    """Cap concurrent child processes; call before any section starts."""
+    global _slots
+    _slots = threading.BoundedSemaphore(max(1, n))
+
+
+def own_children(owner):
+    """Make ``owner`` (a threading.Event) the owner of children started from here on.
+
+    Applies to the current thread or task; hand work to other threads
+    through ``carry_children`` so their children have the same owner.
+    """
+    _owner.set(owner)
+
+
+def carry_children(fn):
+    """Wrap ``fn`` to run, in whatever thread, with the caller's child-process owner."""
+    owner = _owner.get()
+
+    def wrapper(*args, **kwargs):
+        _owner.set(owner)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def process_slot():
+    """Hold one of the shared child-process slots for the ``with`` block.
+
+    Raises OSError (TIMED_OUT) instead once the owner has been abandoned.
+    """
+    slots = _slots
+    with slots:
+        owner = _owner.get()
+        if owner is not None and owner.is_set():
+            raise OSError(TIMED_OUT)
+        yield
+
+
+_live = {}  # pid -> (Popen, leads its own process group, owner)
+_live_lock = threading.Lock()
+
+
+def _kill(proc, own_group):
+    try:
+        if own_group:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass  # already gone
+
+
+@contextlib.contextmanager
+def tracked(proc, own_group=False):
+    """Register a running child for ``kill_children`` during the ``with`` block.
+
+    ``own_group`` is for children started with ``start_new_session``: the
+    whole group is killed, including anything they spawned (e.g. ssh).
+    """
+    owner = _owner.get()
+    with _live_lock:
+        _live[proc.pid] = (proc, own_group, owner)
+    if owner is not None and owner.is_set():
+        _kill(proc, own_group)  # started just as its owner was abandoned
+    try:
+        yield proc
+    finally:
+        with _live_lock:
+            _live.pop(proc.pid, None)
+
+
+def kill_children():
+    """SIGKILL every tracked child still running."""
+    with _live_lock:
+        procs = list(_live.values())
+    for proc, own_group, _ in procs:
+        _kill(proc, own_group)
+
+
+def abandon_children(owner):
+    """SIGKILL ``owner``'s running children; any it starts later are refused or killed."""
+    owner.set()
+    with _live_lock:
+        procs = [(proc, own_group) for proc, own_group, o in _live.values() if o is owner]
+    for proc, own_group in procs:
+        _kill(proc, own_group)
+
+
+def subprocess_run(cmd, timeout=None, capture_output=False, **kwargs):
+    """``subprocess.run`` with the child tracked while it runs."""
+    if capture_output:
+        kwargs.update(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with subprocess.Popen(cmd, **kwargs) as proc, tracked(proc):
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+def run(cmd, cwd=None, timeout=10, env=None):
+    """Run a command and return (stdout, error); error is TIMED_OUT on timeout."""
+    try:
+        with process_slot():
+            result = subprocess_run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                cwd=cwd,
+                env=env,
+            )
+    except subprocess.TimeoutExpired:
+        return "", TIMED_OUT
+    except OSError as e:
+        return "", str(e)
+    if result.returncode != 0:
+        return "", result.stderr.strip()
+    return result.stdout.strip(), None
+
+
+def in_daemon_thread(loop, name, fn, *args):
+    """Run blocking ``fn`` in a daemon thread; returns a future on ``loop``.
+
+    If the future has been cancelled (e.g. a section timed out) or the loop
+    is already closed by the time ``fn`` returns, the result is dropped.
+    """
+    future = loop.create_future()
+
+    def settle(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target():
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            pass  # loop closed: the briefing finished without this result
+
+    threading.Thread(target=carry_children(target), name=name, daemon=True).start()
+    return future
+
+
+def _fetch(url, headers, timeout):
+    host = urllib.parse.urlsplit(url).hostname
+    request = urllib.request.Request(url, headers=headers)
+    # A fresh opener reads HTTP(S)_PROXY/NO_PROXY now, not at first use
+    try:
+        with urllib.request.build_opener().open(request, timeout=timeout) as resp:
+            body = resp.read(HTTP_LIMIT + 1)
+    except urllib.error.HTTPError as e:
+        raise OSError(f"HTTP {e.code} from {host}")
+    except urllib.error.URLError as e:
+        raise OSError(f"{host}: {e.reason}")
+    if len(body) > HTTP_LIMIT:
+        raise OSError(f"response from {host} exceeds {HTTP_LIMIT} bytes")
+    return body
+
+
+async def get_json(url, headers=None, timeout=15):
+    """GET ``url`` without blocking the event loop and decode its JSON body.
+
+    Proxies from the environment and redirects are handled by urllib,
+    which runs in a daemon thread. Raises OSError on connection errors,
+    timeouts and non-2xx statuses. Cancelling the awaiting task abandons
+    the request rather than waiting for it.
+    """
+    loop = asyncio.get_running_loop()
+    request = in_daemon_thread(loop, "http", _fetch, url, headers or {}, timeout)
+    try:
+        body = await asyncio.wait_for(request, timeout)
+    except asyncio.TimeoutError:
+        raise OSError(f"{urllib.parse.urlsplit(url).hostname} {TIMED_OUT} after {timeout:g}s")
+    return json.loads(body)
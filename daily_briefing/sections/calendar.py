@@ -1,14 +1,30 @@
 """Calendar section — Google Calendar API with service account."""
 
+import heapq
+import itertools
 import os
 import json
+import re
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from ..cache import load_json, save_json
+from .ics import ics_events
+
 # Default paths
 DEFAULT_KEY_PATH = Path.home() / ".config" / "daily-briefing" / "service-account.json"
 DEFAULT_CALENDARS_PATH = Path.home() / ".config" / "daily-briefing" / "calendars.json"
 
+# Google's batch endpoint accepts at most 50 calls per request
+BATCH_SIZE = 50
+# Days ahead a full sync covers; incremental syncs keep this window current
+SYNC_DAYS = 14
+STORE_VERSION = 1
+TOKEN_FILE = "google-token.json"
+# Cached access tokens are dropped this long before Google expires them
+TOKEN_MARGIN = timedelta(minutes=5)
+
 
 def _get_key_path():
     """Resolve the service account key file path."""
@@ -25,8 +41,9 @@ def _get_key_path():
 def _get_calendar_ids():
     """Load calendar IDs from config file or env var.
 
-    Config file format (JSON array):
-        [{"id": "user@example.com", "name": "Personal"}, ...]
+    Config file format (JSON array); ``ics`` entries are local files:
+        [{"id": "user@example.com", "name": "Personal"},
+         {"ics": "~/calendars/team.ics", "name": "Team"}, ...]
 
     Env var format (comma-separated):
         GOOGLE_CALENDAR_IDS=user@example.com,work@example.com
@@ -45,16 +62,229 @@ def _get_calendar_ids():
         try:
             with open(p) as f:
                 cals = json.load(f)
-            return [{"id": c["id"], "name": c.get("name", c["id"])} for c in cals]
+            return [
+                {"ics": str(Path(c["ics"]).expanduser()), "name": c.get("name", Path(c["ics"]).stem)}
+                if "ics" in c
+                else {"id": c["id"], "name": c.get("name", c["id"])}
+                for c in cals
+            ]
         except (json.JSONDecodeError, KeyError):
             pass
 
     return []
 
 
+def _store_file(cal_id):
+    return f"calendar-{re.sub(r'[^A-Za-z0-9_.@-]', '_', cal_id)}.json"
+
+
+def _parse_when(when):
+    """An event ``start``/``end`` as an aware datetime (all-day dates at local midnight)."""
+    if "dateTime" in when:
+        return datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00"))
+    if "date" in when:
+        return datetime.fromisoformat(when["date"]).astimezone()
+    return None
+
+
+def _apply_changes(store, items):
+    """Fold a page of events into the store; cancelled ones are deletions."""
+    events = store["events"]
+    for event in items:
+        if event.get("status") == "cancelled":
+            events.pop(event["id"], None)
+        else:
+            events[event["id"]] = {
+                "summary": event.get("summary", "Busy"),
+                "location": event.get("location", ""),
+                "start": event.get("start", {}),
+                "end": event.get("end", {}),
+            }
+
+
+def _events_between(store, start, end):
+    """Stored events overlapping ``[start, end)``."""
+    for event in store["events"].values():
+        event_start = _parse_when(event["start"])
+        event_end = _parse_when(event["end"]) or event_start
+        if event_start and event_start < end and event_end > start:
+            yield event
+
+
+def _store_usable(store, start, end):
+    """Whether ``store`` can be synced incrementally to answer ``[start, end)``."""
+    return bool(
+        store
+        and store.get("version") == STORE_VERSION
+        and store.get("syncToken")
+        and datetime.fromisoformat(store["window"][0]) <= start
+        and datetime.fromisoformat(store["window"][1]) >= end
+    )
+
+
+def _fresh_stores(calendar_ids, start, end, max_age):
+    """Stored ``(calendar, store)`` pairs if every calendar synced within ``max_age`` seconds.
+
+    Lets a frequent run answer from disk without importing the Google
+    client at all. Returns None when any calendar needs a sync.
+    """
+    stores = []
+    for cal in calendar_ids:
+        store = load_json(_store_file(cal["id"]))
+        if not _store_usable(store, start, end) or time.time() - store.get("syncedAt", 0) > max_age:
+            return None
+        stores.append((cal, store))
+    return stores
+
+
+def _load_credentials(key_path, use_cache=True):
+    """Service account credentials, primed with a cached access token if still valid."""
+    from google.oauth2 import service_account
+
+    credentials = service_account.Credentials.from_service_account_file(
+        str(key_path),
+        scopes=["https://www.googleapis.com/auth/calendar.readonly"],
+    )
+    cached = load_json(TOKEN_FILE, {}) if use_cache else {}
+    if cached.get("account") == credentials.service_account_email and cached.get("token"):
+        # google-auth keeps expiry as naive UTC
+        expiry = datetime.fromisoformat(cached["expiry"])
+        if expiry - TOKEN_MARGIN > datetime.now(timezone.utc).replace(tzinfo=None):
+            credentials.token = cached["token"]
+            credentials.expiry = expiry
+    return credentials
+
+
+def _save_token(credentials):
+    if credentials.token and credentials.expiry:
+        save_json(TOKEN_FILE, {
+            "account": credentials.service_account_email,
+            "token": credentials.token,
+            "expiry": credentials.expiry.isoformat(),
+        })
+
+
+def _sync_calendars(service, calendar_ids, start, end, use_store=True):
+    """Yield ``(calendar, store)`` for each calendar that could be read.
+
+    Each calendar has a local store of events plus the ``nextSyncToken``
+    of its last sync, so a run only downloads what changed since then. A
+    full sync covering SYNC_DAYS from ``start`` happens when there is no
+    store, it no longer covers ``[start, end)``, or Google answers 410
+    (token expired). Every page of every calendar goes out in batch
+    requests of up to BATCH_SIZE calls.
+    """
+    from googleapiclient.errors import HttpError
+
+    def full_sync():
+        window_end = max(end, start + timedelta(days=SYNC_DAYS))
+        store = {"version": STORE_VERSION, "window": [start.isoformat(), window_end.isoformat()], "events": {}}
+        return store, {"timeMin": start.isoformat(), "timeMax": window_end.isoformat()}
+
+    pending = {}
+    for i, cal in enumerate(calendar_ids):
+        store = load_json(_store_file(cal["id"])) if use_store else None
+        if _store_usable(store, start, end):
+            pending[str(i)] = (store, {"syncToken": store["syncToken"]})
+        else:
+            pending[str(i)] = full_sync()
+
+    done = {}
+
+    def collect(request_id, response, exception):
+        store, params = pending.pop(request_id)
+        if exception is not None:
+            if isinstance(exception, HttpError) and exception.resp.status == 410 and "syncToken" in params:
+                # Sync token expired — start over with a full sync
+                retry[request_id] = full_sync()
+            # Otherwise the calendar isn't accessible — skip silently
+            return
+        _apply_changes(store, response.get("items", []))
+        if response.get("nextPageToken"):
+            retry[request_id] = (store, dict(params, pageToken=response["nextPageToken"]))
+        else:
+            store["syncToken"] = response.get("nextSyncToken")
+            store["syncedAt"] = time.time()
+            done[request_id] = store
+
+    while pending:
+        retry = {}
+        ids = list(pending)
+        for offset in range(0, len(ids), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for request_id in ids[offset:offset + BATCH_SIZE]:
+                batch.add(
+                    service.events().list(
+                        calendarId=calendar_ids[int(request_id)]["id"],
+                        singleEvents=True,
+                        maxResults=250,
+                        **pending[request_id][1],
+                    ),
+                    request_id=request_id,
+                )
+            batch.execute()
+        pending = retry
+
+    for i, cal in enumerate(calendar_ids):
+        store = done.get(str(i))
+        if store is None:
+            continue
+        if use_store:
+            # Events that ended before today are never shown again
+            store["events"] = {
+                k: e for k, e in store["events"].items()
+                if (_parse_when(e["end"]) or _parse_when(e["start"]) or start) >= start
+            }
+            save_json(_store_file(cal["id"]), store)
+        yield cal, store
+
+
+def _format_event(cal, event):
+    start_dt = event["start"].get("dateTime", event["start"].get("date", ""))
+
+    # Extract time portion
+    start_time = ""
+    if "T" in start_dt:
+        try:
+            t = _parse_when(event["start"]).astimezone()
+            start_time = t.strftime("%I:%M %p").lstrip("0")
+        except ValueError:
+            start_time = start_dt
+    else:
+        start_time = "All day"
+
+    return {
+        "start_time": start_time,
+        "title": event["summary"],
+        "location": event["location"],
+        "calendar": cal["name"],
+    }
+
+
+def _agenda(sources, start, days):
+    """Yield ``{"date", "events"}`` per local day with events, in start order.
+
+    Each calendar's events are sorted on their own and the calendars are
+    k-way merged with heapq.merge, so no combined list is ever built.
+    Events already running at ``start`` are listed on the first day.
+    """
+    def by_start(cal, events):
+        keyed = sorted(((_parse_when(e["start"]) or start, i, e) for i, e in enumerate(events)), key=lambda k: k[:2])
+        for when, _, event in keyed:
+            yield max(when, start), cal, event
+
+    merged = heapq.merge(*(by_start(cal, events) for cal, events in sources), key=lambda item: item[0])
+    for day, items in itertools.groupby(merged, key=lambda item: item[0].astimezone().date()):
+        yield {"date": day.isoformat(), "events": [_format_event(cal, event) for _, cal, event in items]}
+
+
 def get_calendar(args):
+    calendars = _get_calendar_ids()
+    ics_calendars = [c for c in calendars if "ics" in c]
+    calendar_ids = [c for c in calendars if "id" in c]
+
     key_path = _get_key_path()
-    if not key_path:
+    if not key_path and not ics_calendars:
         return {
             "available": False,
             "note": (
@@ -69,8 +299,7 @@ def get_calendar(args):
             ),
         }
 
-    calendar_ids = _get_calendar_ids()
-    if not calendar_ids:
+    if not calendars:
         return {
             "available": False,
             "note": (
@@ -81,87 +310,52 @@ def get_calendar(args):
             ),
         }
 
-    try:
-        from google.oauth2 import service_account
-        from googleapiclient.discovery import build
-    except ImportError:
-        return {
-            "available": False,
-            "note": (
-                "google-api-python-client / google-auth not installed.\n"
-                "  Run: pip install google-api-python-client google-auth"
-            ),
-        }
+    # Local midnights, so "today" is the user's day and DST days stay 23/25h long
+    today = datetime.now().date()
+    start = datetime.combine(today, datetime.min.time()).astimezone()
+    end = datetime.combine(today + timedelta(days=args.days), datetime.min.time()).astimezone()
 
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            str(key_path),
-            scopes=["https://www.googleapis.com/auth/calendar.readonly"],
-        )
-        service = build("calendar", "v3", credentials=credentials, cache_discovery=False)
-
-        now = datetime.now(timezone.utc)
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        time_min = start_of_day.isoformat()
-        time_max = end_of_day.isoformat()
-
-        all_events = []
-        for cal in calendar_ids:
-            cal_id = cal["id"]
-            cal_name = cal["name"]
-            try:
-                events_result = (
-                    service.events()
-                    .list(
-                        calendarId=cal_id,
-                        timeMin=time_min,
-                        timeMax=time_max,
-                        singleEvents=True,
-                        orderBy="startTime",
-                        maxResults=50,
-                    )
-                    .execute()
-                )
-            except Exception:
-                # Calendar not accessible — skip silently
-                continue
-
-            for event in events_result.get("items", []):
-                start = event.get("start", {})
-                start_dt = start.get("dateTime", start.get("date", ""))
-
-                # Extract time portion
-                start_time = ""
-                if "T" in start_dt:
-                    try:
-                        t = datetime.fromisoformat(start_dt)
-                        start_time = t.strftime("%I:%M %p").lstrip("0")
-                    except ValueError:
-                        start_time = start_dt
-                else:
-                    start_time = "All day"
-
-                all_events.append({
-                    "start_time": start_time,
-                    "title": event.get("summary", "Busy"),
-                    "location": event.get("location", ""),
-                    "calendar": cal_name,
-                    "_sort": start_dt,
-                })
-
-        # Sort by start time
-        all_events.sort(key=lambda e: e.get("_sort", ""))
-        # Remove sort key
-        for e in all_events:
-            e.pop("_sort", None)
+    use_cache = not args.no_cache
+    stores = []
+    if calendar_ids and key_path:
+        stores = _fresh_stores(calendar_ids, start, end, args.calendar_refresh) if use_cache else None
 
-        return {
-            "available": True,
-            "events": all_events,
-            "count": len(all_events),
-        }
+    # Everything below needs the network — only now pay for the Google imports
+    if stores is None:
+        try:
+            from googleapiclient.discovery import build
+        except ImportError:
+            return {
+                "available": False,
+                "note": (
+                    "google-api-python-client / google-auth not installed.\n"
+                    "  Run: pip install google-api-python-client google-auth"
+                ),
+            }
+
+        try:
+            credentials = _load_credentials(key_path, use_cache)
+            # The Calendar v3 discovery document ships with googleapiclient
+            service = build("calendar", "v3", credentials=credentials, static_discovery=True)
+            stores = list(_sync_calendars(service, calendar_ids, start, end, use_store=use_cache))
+            if use_cache:
+                _save_token(credentials)
+        except Exception as e:
+            return {"available": True, "error": str(e)}
+
+    sources = [(cal, _events_between(store, start, end)) for cal, store in stores]
+    for cal in ics_calendars:
+        try:
+            events = list(ics_events(cal["ics"], start, end, use_cache))
+        except (OSError, ValueError):
+            # Missing or unreadable export — skip silently like an inaccessible calendar
+            continue
+        sources.append((cal, events))
 
-    except Exception as e:
-        return {"available": True, "error": str(e)}
+    days = list(_agenda(sources, start, args.days))
+    return {
+        "available": True,
+        "days": days,
+        "windowDays": args.days,
+        "count": sum(len(d["events"]) for d in days),
+    }
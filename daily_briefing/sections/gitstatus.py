@@ -1,103 +1,786 @@
 """Git status section — scans repos for uncommitted changes, ahead/behind, recent commits."""
 
 import os
+import signal
+import struct
 import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from ..cache import load_json, save_json
+from ..runner import TIMED_OUT, carry_children, process_slot, run as _run, tracked
 
-def _run(cmd, cwd=None, timeout=10):
-    """Run a command and return (stdout, error)."""
+CACHE_FILE = "git.json"
+CACHE_VERSION = 4
+DISCOVERY_FILE = "git-discovery.json"
+DISCOVERY_VERSION = 1
+RECENT_WINDOW = timedelta(days=1)
+FETCH_PER_HOST = 4  # concurrent fetches against any one host
+
+
+def _parse_porcelain_v2(out):
+    """Parse ``git status --porcelain=v2 --branch`` into branch/upstream/counts."""
+    parsed = {"branch": "unknown", "upstream": None, "ahead": 0, "behind": 0, "uncommitted": 0}
+    for line in out.splitlines():
+        if not line.strip():
+            continue
+        if not line.startswith("# "):
+            parsed["uncommitted"] += 1
+            continue
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        key = parts[1]
+        if key == "branch.head":
+            parsed["branch"] = "detached" if parts[2] == "(detached)" else parts[2]
+        elif key == "branch.upstream":
+            parsed["upstream"] = parts[2]
+        elif key == "branch.ab" and len(parts) >= 4:
+            parsed["ahead"] = int(parts[2].lstrip("+"))
+            parsed["behind"] = int(parts[3].lstrip("-"))
+    return parsed
+
+
+# --- Pure-Python ref reader -------------------------------------------------
+#
+# Branch, upstream and the commit each points at can be read straight from
+# the git dir without forking git: HEAD, loose refs, packed-refs and the
+# branch.<name>.remote/merge keys in config.
+
+
+def _git_dirs(repo_path, kind):
+    """Locate ``(git_dir, common_dir)`` for a repo, or ``(None, None)``.
+
+    Linked worktrees have a ``.git`` file pointing at their private git dir,
+    which in turn names the shared ("common") dir holding refs and config.
+    """
+    if kind == "bare":
+        git_dir = repo_path
+    elif kind == "worktree":
+        try:
+            content = (repo_path / ".git").read_text().strip()
+        except OSError:
+            return None, None
+        if not content.startswith("gitdir:"):
+            return None, None
+        git_dir = Path(content[len("gitdir:"):].strip())
+        if not git_dir.is_absolute():
+            git_dir = repo_path / git_dir
+    else:
+        git_dir = repo_path / ".git"
+
+    common_dir = git_dir
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=cwd,
-        )
-        if result.returncode != 0:
-            return "", result.stderr.strip()
-        return result.stdout.strip(), None
-    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-        return "", str(e)
+        common = (git_dir / "commondir").read_text().strip()
+        common_dir = Path(common) if Path(common).is_absolute() else git_dir / common
+    except OSError:
+        pass
+    return git_dir, common_dir
+
+
+def _read_packed_refs(common_dir):
+    refs = {}
+    try:
+        with open(common_dir / "packed-refs") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                parts = line.split()
+                if len(parts) == 2:
+                    refs[parts[1]] = parts[0]
+    except OSError:
+        pass
+    return refs
+
 
+def _resolve_ref(common_dir, refname, packed):
+    """Resolve a full refname to a SHA via loose refs, then packed-refs.
 
-def _scan_repo(repo_path):
-    """Scan a single git repo for status info."""
-    git_dir = repo_path / ".git"
-    if not git_dir.exists():
+    ``packed`` is filled from packed-refs on the first miss, since that file
+    can be large and most refs we look up are loose.
+    """
+    for _ in range(5):  # follow at most a few symbolic refs
+        try:
+            value = (common_dir / refname).read_text().strip()
+        except OSError:
+            if not packed:
+                packed.update(_read_packed_refs(common_dir))
+            return packed.get(refname)
+        if not value.startswith("ref:"):
+            return value
+        refname = value[len("ref:"):].strip()
+    return None
+
+
+def _read_head(git_dir):
+    """Return ``(branch_ref, sha)``; ``branch_ref`` is None for a detached HEAD."""
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None, None
+    if head.startswith("ref:"):
+        return head[len("ref:"):].strip(), None
+    return None, head
+
+
+def _read_config(common_dir):
+    """Parse the repo config into ``{section: {key: value}}``.
+
+    Only what we need is supported: ``[branch "x"]``/``[remote "x"]``
+    style sections with simple ``key = value`` lines; keys are lowercased.
+    """
+    config = {}
+    section = None
+    try:
+        with open(common_dir / "config") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith(("#", ";")):
+                    continue
+                if line.startswith("["):
+                    section = config.setdefault(line.strip("[]").strip(), {})
+                    continue
+                if section is None or "=" not in line:
+                    continue
+                key, value = (x.strip() for x in line.split("=", 1))
+                section[key.lower()] = value.strip('"')
+    except OSError:
+        pass
+    return config
+
+
+def _read_refs(git_dir, common_dir):
+    """Read branch, HEAD SHA, upstream ref and upstream SHA without forking git.
+
+    Returns None if HEAD can't be read (e.g. a reftable repo), in which case
+    the caller should fall back to asking git.
+    """
+    branch_ref, head_sha = _read_head(git_dir)
+    if branch_ref is None and head_sha is None:
         return None
 
-    name = repo_path.name
-    info = {"name": name, "path": str(repo_path)}
-    cwd = str(repo_path)
+    packed = {}
+    refs = {
+        "branchRef": branch_ref,
+        "upstreamRef": None,
+        "upstream": None,
+        "upstreamSha": None,
+        "remote": None,
+        "remoteUrl": None,
+    }
+    if branch_ref is None:
+        refs["branch"] = "detached"
+        refs["sha"] = head_sha
+        return refs
+
+    refs["branch"] = branch_ref[len("refs/heads/"):] if branch_ref.startswith("refs/heads/") else branch_ref
+    refs["sha"] = _resolve_ref(common_dir, branch_ref, packed)
 
-    # Uncommitted changes
-    out, err = _run(["git", "status", "--porcelain"], cwd=cwd)
-    if err is None and out:
-        info["uncommitted"] = len([l for l in out.splitlines() if l.strip()])
-    else:
-        info["uncommitted"] = 0
+    config = _read_config(common_dir)
+    branch_config = config.get(f'branch "{refs["branch"]}"', {})
+    remote, merge = branch_config.get("remote"), branch_config.get("merge")
+    if remote and merge and merge.startswith("refs/heads/"):
+        short = merge[len("refs/heads/"):]
+        if remote == ".":
+            refs["upstreamRef"], refs["upstream"] = merge, short
+        else:
+            refs["upstreamRef"], refs["upstream"] = f"refs/remotes/{remote}/{short}", f"{remote}/{short}"
+            refs["remote"] = remote
+            refs["remoteUrl"] = config.get(f'remote "{remote}"', {}).get("url")
+        refs["upstreamSha"] = _resolve_ref(common_dir, refs["upstreamRef"], packed)
+    return refs
 
-    # Current branch
-    out, err = _run(["git", "branch", "--show-current"], cwd=cwd)
-    info["branch"] = out if not err else "unknown"
-    if not info["branch"]:
-        info["branch"] = "detached"
 
-    # Ahead/behind
+def _ahead_behind(repo_path, sha, upstream_sha):
+    """Ahead/behind counts; only forks ``git rev-list`` when the tips differ."""
+    if not sha or not upstream_sha or sha == upstream_sha:
+        return 0, 0
     out, err = _run(
-        ["git", "rev-list", "--left-right", "--count", "HEAD...@{upstream}"],
-        cwd=cwd,
+        ["git", "rev-list", "--left-right", "--count", f"{sha}...{upstream_sha}"],
+        cwd=str(repo_path),
     )
-    if not err and out:
-        parts = out.split()
-        info["ahead"] = int(parts[0]) if len(parts) > 0 else 0
-        info["behind"] = int(parts[1]) if len(parts) > 1 else 0
-    else:
-        info["ahead"] = 0
-        info["behind"] = 0
+    parts = out.split() if not err else []
+    if len(parts) != 2:
+        return 0, 0
+    return int(parts[0]), int(parts[1])
+
 
-    # Recent commits (last 24h)
-    since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+def _index_entries(git_dir):
+    """Number of entries in the index, read from its 12-byte header."""
+    try:
+        with open(git_dir / "index", "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return 0
+    if len(header) < 12 or header[:4] != b"DIRC":
+        return 0
+    return struct.unpack(">I", header[8:12])[0]
+
+
+def _status_cmd(git_dir, large_repo, with_branch):
+    """Build the ``git status`` command line; returns ``(cmd, fast)``.
+
+    Repos with at least ``large_repo`` index entries get fast mode: untracked
+    files aren't searched for (the bulk of the cost on huge trees), and on
+    platforms with git's builtin fsmonitor daemon it is used to avoid
+    stat-ing every tracked file.
+    """
+    fast = git_dir is not None and _index_entries(git_dir) >= large_repo
+    cmd = ["git"]
+    if fast and sys.platform in ("darwin", "win32"):
+        cmd += ["-c", "core.fsmonitor=true"]
+    cmd += ["status", "--porcelain=v2"]
+    if with_branch:
+        cmd.append("--branch")
+    if fast:
+        cmd.append("--untracked-files=no")
+    return cmd, fast
+
+
+def _parse_track(track):
+    """Parse ``%(upstream:track)``: ``[ahead 1, behind 2]``, ``[gone]`` or empty."""
+    ahead = behind = 0
+    gone = False
+    for part in track.strip("[]").split(","):
+        part = part.strip()
+        if part == "gone":
+            gone = True
+        elif part.startswith("ahead "):
+            ahead = int(part[len("ahead "):])
+        elif part.startswith("behind "):
+            behind = int(part[len("behind "):])
+    return ahead, behind, gone
+
+
+def _short_ref(refname):
+    for prefix in ("refs/heads/", "refs/remotes/"):
+        if refname.startswith(prefix):
+            return refname[len(prefix):]
+    return refname
+
+
+def _branch_inventory(repo_path):
+    """All local branches with upstream tracking info from one ``for-each-ref``.
+
+    git computes ahead/behind for every branch inside that single process,
+    so the cost stays at one fork however many branches a repo has.
+    """
     out, err = _run(
-        ["git", "log", f"--since={since}", "--oneline", "--no-merges"],
-        cwd=cwd,
+        [
+            "git",
+            "for-each-ref",
+            "--format=%(refname)%09%(upstream)%09%(upstream:track)%09%(committerdate:unix)",
+            "refs/heads",
+        ],
+        cwd=str(repo_path),
     )
-    if not err and out:
-        info["recentCommits"] = len([l for l in out.splitlines() if l.strip()])
+    if err is not None:
+        return None
+    branches = []
+    for line in out.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 4:
+            continue
+        refname, upstream, track, date = parts
+        ahead, behind, gone = _parse_track(track)
+        branches.append({
+            "name": _short_ref(refname),
+            "upstream": _short_ref(upstream) or None,
+            "ahead": ahead,
+            "behind": behind,
+            "gone": gone,
+            "lastCommit": int(date) if date.isdigit() else 0,
+        })
+    return branches
+
+
+def _stash_count(common_dir):
+    """Number of stash entries — one line per entry in the stash reflog."""
+    try:
+        with open(common_dir / "logs" / "refs" / "stash", "rb") as f:
+            return sum(1 for line in f if line.strip())
+    except OSError:
+        return 0
+
+
+def _recent_commit_times(repo_path, git_dir, since):
+    """Commit timestamps of non-merge commits on HEAD newer than ``since``.
+
+    The HEAD reflog is touched whenever HEAD moves (commit, pull, checkout,
+    reset), so if it has not been modified since ``since`` no new commit can
+    have landed and we can skip the ``git log`` call entirely.
+    """
+    if git_dir is not None:
+        try:
+            if (git_dir / "logs" / "HEAD").stat().st_mtime < since.timestamp():
+                return []
+        except OSError:
+            pass
+
+    out, err = _run(
+        ["git", "log", f"--since={since.isoformat()}", "--format=%ct", "--no-merges"],
+        cwd=str(repo_path),
+    )
+    if err or not out:
+        return []
+    return [int(l) for l in out.splitlines() if l.strip().isdigit()]
+
+
+STATUS_FIELDS = ("uncommitted", "statusMs", "fastStatus", "statusTimedOut")
+
+
+def _probe_status(repo_path, kind, git_dir, with_branch, large_repo, status_timeout):
+    """Working-tree state from one ``git status --porcelain=v2``.
+
+    This is never served from the cache: editing a tracked file changes
+    nothing under ``.git``, so no fingerprint can tell a clean repo from a
+    dirty one. A status that takes longer than ``status_timeout`` leaves
+    ``uncommitted`` as None with ``statusTimedOut`` set — never a
+    misleading 0. With ``with_branch``, git's branch and upstream are
+    returned as well.
+    """
+    if kind == "bare":
+        return {"uncommitted": 0}
+    fields = {}
+    cmd, fast = _status_cmd(git_dir, large_repo, with_branch)
+    started = time.perf_counter()
+    out, err = _run(cmd, cwd=str(repo_path), timeout=status_timeout)
+    fields["statusMs"] = round((time.perf_counter() - started) * 1000)
+    if fast:
+        fields["fastStatus"] = True
+    if err is None:
+        status = _parse_porcelain_v2(out)
+        fields["uncommitted"] = status["uncommitted"]
+        if with_branch:
+            fields.update((k, status[k]) for k in ("branch", "upstream", "ahead", "behind"))
+    elif err == TIMED_OUT:
+        fields["uncommitted"] = None
+        fields["statusTimedOut"] = True
     else:
-        info["recentCommits"] = 0
+        fields["uncommitted"] = 0
+    return fields
+
+
+def _scan_repo(repo_path, kind="repo", name=None, branches=False, large_repo=100_000, status_timeout=10):
+    """Scan a single git repo for status info.
+
+    Branch and upstream are read straight from the git dir. The uncommitted
+    count takes one ``git status --porcelain=v2`` (see _probe_status);
+    ahead/behind only forks ``git rev-list`` when HEAD and its upstream
+    point at different commits, and recent commits need at most one
+    ``git log``. Bare repos have no working tree, so only the branch and
+    recent commits are reported.
+
+    With ``branches``, one ``git for-each-ref`` adds every local branch's
+    tracking state (which also supplies HEAD's ahead/behind) and the stash
+    reflog adds a stash count.
+    """
+    started = time.perf_counter()
+    info = {"name": name or repo_path.name, "path": str(repo_path)}
+    git_dir, common_dir = _git_dirs(repo_path, kind)
+    refs = _read_refs(git_dir, common_dir) if git_dir is not None else None
+
+    if kind == "bare":
+        info["bare"] = True
+    # If we couldn't read the refs ourselves, let git report the branch too
+    status = _probe_status(repo_path, kind, git_dir, refs is None, large_repo, status_timeout)
+    if kind == "worktree":
+        info["worktree"] = True
+
+    inventory = _branch_inventory(repo_path) if branches else None
+    if inventory is not None:
+        info["branches"] = inventory
+        info["stashes"] = _stash_count(common_dir) if common_dir is not None else 0
+
+    if refs is not None:
+        current = next((b for b in inventory or [] if b["name"] == refs["branch"]), None)
+        if kind == "bare":
+            ahead, behind = 0, 0
+        elif current is not None:
+            ahead, behind = current["ahead"], current["behind"]
+        else:
+            ahead, behind = _ahead_behind(repo_path, refs["sha"], refs["upstreamSha"])
+        status.update(branch=refs["branch"], upstream=refs["upstream"], ahead=ahead, behind=behind)
+
+    info["branch"] = status.pop("branch", "unknown")
+    info["upstream"] = status.pop("upstream", None)
+    info["ahead"] = status.pop("ahead", 0)
+    info["behind"] = status.pop("behind", 0)
+    info.update(status)
+
+    # Recent commits (last 24h) — the timestamps are kept so cached results
+    # can be re-counted later without asking git again
+    since = datetime.now(timezone.utc) - RECENT_WINDOW
+    info["_commitTimes"] = _recent_commit_times(repo_path, git_dir, since)
+    info["recentCommits"] = len(info["_commitTimes"])
+    info["_refs"] = [refs["branchRef"], refs["upstreamRef"]] if refs else None
+    info["probeMs"] = round((time.perf_counter() - started) * 1000)
 
     return info
 
 
+# --- Fetch stage -------------------------------------------------------------
+
+
+def _remote_host(url):
+    """Host part of a remote URL (``https://``, ``ssh://`` or scp-style)."""
+    if not url:
+        return "local"
+    if "://" in url:
+        return urllib.parse.urlsplit(url).hostname or "local"
+    head = url.split("/", 1)[0]
+    if ":" in head:
+        return head.split(":", 1)[0].rsplit("@", 1)[-1]
+    return "local"
+
+
+def _fetch(repo_path, remote, timeout):
+    """Run ``git fetch`` for one remote; returns an error string or None.
+
+    git runs in its own session so a timeout kills the whole process group,
+    including any ssh it spawned that would otherwise hold our pipe open.
+    """
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    env.setdefault("GIT_SSH_COMMAND", "ssh -o BatchMode=yes")
+    try:
+        proc = subprocess.Popen(
+            ["git", "fetch", "--quiet", remote],
+            cwd=str(repo_path),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            start_new_session=True,
+        )
+    except OSError as e:
+        return str(e)
+    with tracked(proc, own_group=True):
+        try:
+            _, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            proc.communicate()
+            return f"fetch timed out after {timeout:.0f}s"
+    if proc.returncode != 0:
+        return err.strip() or f"git fetch exited with {proc.returncode}"
+    return None
+
+
+class _Fetcher:
+    """Fetches each repo's upstream remote under a shared time budget.
+
+    At most ``jobs`` fetches run at once, and at most FETCH_PER_HOST against
+    any one host. Repos sharing an object store and remote (worktrees of one
+    clone) are fetched once; the others wait on that fetch.
+    """
+
+    def __init__(self, jobs, timeout, budget):
+        self.timeout = timeout
+        self.deadline = time.monotonic() + budget
+        self.slots = threading.BoundedSemaphore(jobs)
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.pending = {}
+
+    def _remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def fetch(self, repo_path, kind):
+        """Fetch the repo's upstream remote; returns an error string or None."""
+        git_dir, common_dir = _git_dirs(repo_path, kind)
+        refs = _read_refs(git_dir, common_dir) if git_dir is not None else None
+        if not refs or not refs["remote"]:
+            return None
+
+        key = (str(common_dir.resolve()), refs["remote"])
+        with self.lock:
+            pending = self.pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.pending[key] = {"done": threading.Event(), "error": None}
+            host_slots = self.hosts.setdefault(
+                _remote_host(refs["remoteUrl"]), threading.BoundedSemaphore(FETCH_PER_HOST)
+            )
+
+        if not owner:
+            if not pending["done"].wait(self._remaining()):
+                return "fetch budget exhausted"
+            return pending["error"]
+
+        try:
+            pending["error"] = self._fetch_limited(repo_path, refs["remote"], host_slots)
+        finally:
+            pending["done"].set()
+        return pending["error"]
+
+    def _fetch_limited(self, repo_path, remote, host_slots):
+        if not self.slots.acquire(timeout=self._remaining()):
+            return "fetch budget exhausted"
+        try:
+            if not host_slots.acquire(timeout=self._remaining()):
+                return "fetch budget exhausted"
+            try:
+                with process_slot():
+                    remaining = self._remaining()
+                    if remaining <= 0:
+                        return "fetch budget exhausted"
+                    return _fetch(repo_path, remote, min(self.timeout, remaining))
+            finally:
+                host_slots.release()
+        finally:
+            self.slots.release()
+
+
+# --- Status probe and cache ----------------------------------------------------
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _ref_dirs(common_dir):
+    """Every directory under refs/heads and refs/remotes.
+
+    Creating, deleting or updating a loose ref renames a file into its
+    directory, so these mtimes change whenever any branch moves.
+    """
+    dirs = []
+    for top in ("heads", "remotes"):
+        for root, _, _ in os.walk(common_dir / "refs" / top):
+            dirs.append(Path(root))
+    return dirs
+
+
+def _fingerprint(repo_path, kind, refs, branches=False):
+    """Stat signature of the files the cached ref data depends on.
+
+    Returns None (always re-probe) when the refs couldn't be read directly.
+    """
+    git_dir, common_dir = _git_dirs(repo_path, kind)
+    if git_dir is None or refs is None:
+        return None
+    paths = [
+        git_dir / "HEAD",
+        common_dir / "packed-refs",
+        common_dir / "config",
+    ]
+    paths.extend(common_dir / ref for ref in refs if ref)
+    if branches:
+        paths.append(common_dir / "logs" / "refs" / "stash")
+        paths.extend(_ref_dirs(common_dir))
+    return [_stat_key(p) for p in paths]
+
+
+def _cached_probe(repo_path, kind, name, entry, now, args):
+    """Probe ``repo_path``, reusing its cached ref data while still valid.
+
+    Only what is derived from refs (branch, upstream, ahead/behind, branch
+    inventory, commit times) is cached, keyed on a stat fingerprint of the
+    ref files and expiring after ``--git-cache-ttl`` seconds. The
+    working-tree status is re-run every time.
+    """
+    branches = args.git_branches
+    if (
+        entry
+        and now - entry["probedAt"] < args.git_cache_ttl
+        and entry["branches"] >= branches
+        and entry["fingerprint"] is not None
+        and entry["fingerprint"] == _fingerprint(repo_path, kind, entry["refs"], entry["branches"])
+    ):
+        git_dir, _ = _git_dirs(repo_path, kind)
+        status = _probe_status(
+            repo_path, kind, git_dir, False, args.git_large_repo, args.git_status_timeout
+        )
+        info = {k: v for k, v in entry["info"].items() if k not in STATUS_FIELDS}
+        return dict(entry, info=dict(info, **status))
+
+    info = _scan_repo(
+        repo_path,
+        kind,
+        name,
+        branches=branches,
+        large_repo=args.git_large_repo,
+        status_timeout=args.git_status_timeout,
+    )
+    commit_times = info.pop("_commitTimes")
+    refs = info.pop("_refs")
+    info.pop("recentCommits")
+    return {
+        "fingerprint": _fingerprint(repo_path, kind, refs, branches),
+        "probedAt": now,
+        "info": info,
+        "refs": refs,
+        "branches": branches,
+        "commitTimes": commit_times,
+    }
+
+
+def _scan_dir(path, mtime_ns):
+    """List a directory once: what kind of repo it is, and its subdirectories."""
+    kind = None
+    markers = set()
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            if name == ".git":
+                kind = "repo" if entry.is_dir() else "worktree"
+            elif name in ("HEAD", "objects", "refs"):
+                markers.add(name)
+            if not name.startswith(".") and entry.is_dir():
+                dirs.append(name)
+    if kind is None and len(markers) == 3:
+        kind = "bare"
+    return {"mtime": mtime_ns, "kind": kind, "dirs": [] if kind else sorted(dirs)}
+
+
+def _discover(root, max_depth, ignore, index, new_index):
+    """Find git repos under ``root`` up to ``max_depth`` levels deep.
+
+    Yields ``(path, kind)``. Never descends into a repo. A directory's
+    listing only changes when its own mtime does, so unchanged directories
+    are answered from ``index`` with a single stat instead of a scandir.
+    Raises OSError if ``root`` itself can't be read.
+    """
+    seen = set()
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            st = os.stat(path)
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            key = str(path)
+            node = index.get(key)
+            if node is None or node["mtime"] != st.st_mtime_ns:
+                node = _scan_dir(path, st.st_mtime_ns)
+        except OSError:
+            if depth == 0:
+                raise
+            continue
+        new_index[key] = node
+
+        if node["kind"]:
+            yield path, node["kind"]
+            continue
+        if depth >= max_depth:
+            continue
+        # Reversed so the stack pops children in sorted order
+        for child in reversed(node["dirs"]):
+            child_path = path / child
+            rel = str(child_path.relative_to(root))
+            if any(fnmatch(child, pat) or fnmatch(rel, pat) for pat in ignore):
+                continue
+            stack.append((child_path, depth + 1))
+
+
 def get_git_status(args):
     repos = []
     errors = []
 
+    discovery = load_json(DISCOVERY_FILE, {}) if not args.no_cache else {}
+    index = discovery.get("dirs", {}) if discovery.get("version") == DISCOVERY_VERSION else {}
+    new_index = {}
+
+    candidates = []
     for d in args.git_dirs:
         expanded = Path(d).expanduser()
         try:
-            entries = sorted(expanded.iterdir())
-            for entry in entries:
-                if entry.is_dir() and not entry.name.startswith("."):
-                    result = _scan_repo(entry)
-                    if result:
-                        repos.append(result)
+            for path, kind in _discover(expanded, args.git_depth, args.git_ignore, index, new_index):
+                name = path.name if path == expanded else path.relative_to(expanded).as_posix()
+                candidates.append((path, kind, name))
         except OSError as e:
             errors.append(f"{d}: {e}")
 
+    if not args.no_cache:
+        save_json(DISCOVERY_FILE, {"version": DISCOVERY_VERSION, "dirs": new_index})
+
+    cache = load_json(CACHE_FILE, {}) if not args.no_cache else {}
+    cached = cache.get("repos", {}) if cache.get("version") == CACHE_VERSION else {}
+    now = time.time()
+
+    fetcher = None
+    if args.git_fetch:
+        fetcher = _Fetcher(args.git_fetch_jobs, args.git_fetch_timeout, args.git_fetch_budget)
+    probe_slots = threading.BoundedSemaphore(max(1, args.git_jobs))
+
+    def probe(candidate):
+        repo_path, kind, name = candidate
+        # Fetch and status are pipelined per repo: each repo's status is
+        # computed as soon as its own fetch finishes. A failed or timed-out
+        # fetch leaves the repo marked stale rather than holding up the run.
+        fetch_error = fetcher.fetch(repo_path, kind) if fetcher else None
+        with probe_slots:
+            entry = cached.get(str(repo_path))
+            entry = _cached_probe(repo_path, kind, name, entry, now, args)
+        # The same repo can be reached under a different name from another root
+        entry["info"]["name"] = name
+        return entry, fetch_error
+
+    # Scanning is bound by process-spawn latency, not I/O, so run repos
+    # concurrently. pool.map hands out work as threads free up, so one slow
+    # repo only ties up its own worker. Fetching adds network-bound workers
+    # on top; probe_slots keeps the status probes themselves at --git-jobs.
+    entries = {}
+    fetch_errors = {}
+    jobs = max(1, args.git_jobs + (args.git_fetch_jobs if fetcher else 0))
+    jobs = min(jobs, len(candidates) or 1)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for (repo_path, _, _), (entry, fetch_error) in zip(candidates, pool.map(carry_children(probe), candidates)):
+            entries[str(repo_path)] = entry
+            if fetch_error:
+                fetch_errors[str(repo_path)] = fetch_error
+
+    # recentCommits and branch staleness are time-dependent, so recompute them
+    # from the stored timestamps instead of trusting the values from when the
+    # entry was probed
+    since = now - RECENT_WINDOW.total_seconds()
+    stale_before = now - args.git_stale_days * 86400
+    for entry in entries.values():
+        info = dict(entry["info"])
+        info["recentCommits"] = len([t for t in entry["commitTimes"] if t >= since])
+        if args.git_branches and "branches" in info:
+            info["branches"] = [
+                dict(b, stale=b["lastCommit"] < stale_before) for b in info["branches"]
+            ]
+            info["goneBranches"] = len([b for b in info["branches"] if b["gone"]])
+            info["staleBranches"] = len([b for b in info["branches"] if b["stale"]])
+        else:
+            info.pop("branches", None)
+            info.pop("stashes", None)
+        if info["path"] in fetch_errors:
+            info["stale"] = True
+            info["fetchError"] = fetch_errors[info["path"]]
+        repos.append(info)
+
+    if not args.no_cache:
+        save_json(CACHE_FILE, {"version": CACHE_VERSION, "repos": entries})
+
     # Sort: repos with activity first, then alphabetical
     repos.sort(
         key=lambda r: (
-            -(1 if r["uncommitted"] > 0 or r.get("ahead", 0) > 0 else 0),
+            -(1 if (r["uncommitted"] or 0) > 0 or r.get("ahead", 0) > 0 or r.get("statusTimedOut") else 0),
             r["name"].lower(),
+            r["path"],
         )
     )
 
-    dirty = [r for r in repos if r["uncommitted"] > 0]
+    dirty = [r for r in repos if (r["uncommitted"] or 0) > 0]
     with_recent = [r for r in repos if r["recentCommits"] > 0]
 
     result = {
@@ -106,6 +789,11 @@ def get_git_status(args):
         "reposWithRecentCommits": len(with_recent),
         "repos": repos,
     }
+    if fetcher:
+        result["staleRepos"] = len(fetch_errors)
+    timed_out = [r for r in repos if r.get("statusTimedOut")]
+    if timed_out:
+        result["statusTimeouts"] = len(timed_out)
     if errors:
         result["errors"] = errors
 
@@ -0,0 +1,441 @@
+"""Offline calendars from .ics files.
+
+Files are parsed line by line (only VEVENT properties the briefing shows
+are kept) into a compact index that is cached per file and reused until
+the file's mtime or size changes. Recurring events are stored once, with
+their RRULE, and expanded only inside the window being asked for.
+
+Supported recurrence: FREQ DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL,
+COUNT, UNTIL, BYDAY (with ordinals), BYMONTHDAY, BYMONTH and BYSETPOS,
+plus EXDATE and RECURRENCE-ID overrides. Week starts are taken as Monday.
+"""
+
+import bisect
+import calendar
+import hashlib
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..cache import load_json, save_json
+
+INDEX_VERSION = 2
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+DURATION_RE = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+_zones = {}
+
+
+def _zone(tz):
+    """tzinfo for an index ``tz``: a TZID, "UTC", or None for floating (local) time."""
+    if tz == "UTC":
+        return timezone.utc
+    if tz not in _zones:
+        try:
+            _zones[tz] = ZoneInfo(tz) if tz else None
+        except (ZoneInfoNotFoundError, ValueError):
+            # e.g. Windows zone names from Outlook exports — treat as local
+            _zones[tz] = None
+    return _zones[tz]
+
+
+def _aware(wall, tz):
+    """Attach ``tz`` to a naive wall-clock datetime; floating times are local."""
+    zone = _zone(tz)
+    return wall.replace(tzinfo=zone) if zone else wall.astimezone()
+
+
+# --- Parsing -----------------------------------------------------------------
+
+
+def _unfold(lines):
+    """Yield logical content lines, joining RFC 5545 folded continuations."""
+    current = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split(line):
+    """``NAME;KEY=val:value`` → ``(NAME, {KEY: val}, value)``; quoted params may hold colons."""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return None, {}, ""
+    name, *params = head.split(";")
+    return name.upper(), {k.upper(): v.strip('"') for k, _, v in (p.partition("=") for p in params)}, value
+
+
+def _unescape(text):
+    return text.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+def _parse_dt(value, params):
+    """DTSTART-style value → ``(wall, tz)``; all-day dates get tz "DATE"."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8])), "DATE"
+    wall = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    return wall, "UTC" if value.endswith("Z") else params.get("TZID")
+
+
+def _instant_key(wall, tz):
+    """Identity of one occurrence: epoch seconds, or the ISO date when all-day."""
+    if tz == "DATE":
+        return (wall.date() if isinstance(wall, datetime) else wall).isoformat()
+    return _aware(wall, tz).timestamp()
+
+
+def _parse_duration(value):
+    m = DURATION_RE.match(value.strip())
+    if not m:
+        return None
+    sign, weeks, days, hours, minutes, seconds = m.groups()
+    total = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0),
+    )
+    return -total if sign == "-" else total
+
+
+def _parse_rrule(value):
+    rule = {}
+    for part in value.split(";"):
+        key, _, val = part.partition("=")
+        if key:
+            rule[key.upper()] = val
+    return rule
+
+
+def _events(lines):
+    """Yield the raw properties of each VEVENT, skipping everything else."""
+    props = None
+    for line in _unfold(lines):
+        if line == "BEGIN:VEVENT":
+            props = {"EXDATE": []}
+        elif line == "END:VEVENT":
+            if props is not None:
+                yield props
+            props = None
+        elif props is not None:
+            name, params, value = _split(line)
+            if name == "EXDATE":
+                props["EXDATE"].append((params, value))
+            elif name in ("UID", "SUMMARY", "LOCATION", "DTSTART", "DTEND", "DURATION", "RRULE",
+                          "RECURRENCE-ID", "STATUS"):
+                props[name] = (params, value)
+
+
+def _index_event(props):
+    """Reduce one VEVENT to a JSON-able index record, or None if unusable."""
+    if "DTSTART" not in props:
+        return None
+    start, tz = _parse_dt(props["DTSTART"][1], props["DTSTART"][0])
+    all_day = tz == "DATE"
+    if "DTEND" in props:
+        end, end_tz = _parse_dt(props["DTEND"][1], props["DTEND"][0])
+        if all_day:
+            duration = timedelta(days=((end if end_tz == "DATE" else end.date()) - start).days)
+        else:
+            end_wall = datetime.combine(end, datetime.min.time()) if end_tz == "DATE" else end
+            duration = _aware(end_wall, end_tz) - _aware(start, tz)
+    elif "DURATION" in props:
+        duration = _parse_duration(props["DURATION"][1]) or timedelta(0)
+    else:
+        duration = timedelta(days=1) if all_day else timedelta(0)
+
+    record = {
+        "uid": props.get("UID", ({}, ""))[1],
+        "summary": _unescape(props.get("SUMMARY", ({}, "Busy"))[1]),
+        "location": _unescape(props.get("LOCATION", ({}, ""))[1]),
+        "start": start.isoformat(),
+        "tz": tz,
+        "duration": duration.total_seconds(),
+        "cancelled": props.get("STATUS", ({}, ""))[1].upper() == "CANCELLED",
+    }
+    if "RECURRENCE-ID" in props:
+        rid, rid_tz = _parse_dt(props["RECURRENCE-ID"][1], props["RECURRENCE-ID"][0])
+        record["recurrenceId"] = _instant_key(rid, rid_tz)
+    if "RRULE" in props:
+        record["rrule"] = _parse_rrule(props["RRULE"][1])
+        record["exdates"] = [
+            _instant_key(*_parse_dt(v, params))
+            for params, value in props["EXDATE"]
+            for v in value.split(",")
+            if v.strip()
+        ]
+
+    # Bounds let a query skip events that can't touch its window. All-day
+    # events are local days, so pad their bounds by a day for any offset.
+    if all_day:
+        first = _aware(datetime.combine(start, datetime.min.time()), "UTC") - timedelta(days=1)
+    else:
+        first = _aware(start, tz)
+    record["boundStart"] = first.timestamp()
+    if "rrule" not in record:
+        record["boundEnd"] = record["boundStart"] + max(record["duration"], 0) + (2 * 86400 if all_day else 0)
+    elif "UNTIL" in record["rrule"]:
+        until, until_tz = _parse_dt(record["rrule"]["UNTIL"], {})
+        until = datetime.combine(until, datetime.max.time()) if until_tz == "DATE" else until
+        record["boundEnd"] = _aware(until, until_tz if until_tz != "DATE" else "UTC").timestamp() + record["duration"] + 86400
+    else:
+        record["boundEnd"] = None  # open-ended or COUNT-limited
+    return record
+
+
+def _build_index(path):
+    events = []
+    overrides = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for props in _events(f):
+            record = _index_event(props)
+            if record is None:
+                continue
+            if "recurrenceId" in record:
+                overrides.setdefault(record["uid"], []).append(record["recurrenceId"])
+            if not record["cancelled"]:
+                events.append(record)
+    events.sort(key=lambda e: e["boundStart"])
+    return {"events": events, "starts": [e["boundStart"] for e in events], "overrides": overrides}
+
+
+def load_index(path, use_cache=True):
+    """Parsed index for the .ics file at ``path``, reusing the cached one if unchanged."""
+    st = os.stat(path)
+    name = f"ics-{hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]}.json"
+    stamp = [INDEX_VERSION, st.st_mtime_ns, st.st_size]
+    if use_cache:
+        cached = load_json(name)
+        if cached and cached.get("stamp") == stamp:
+            return cached
+    index = dict(_build_index(path), stamp=stamp)
+    if use_cache:
+        save_json(name, index)
+    return index
+
+
+# --- Recurrence expansion ----------------------------------------------------
+
+
+def _add_months(year, month, n):
+    month += n - 1
+    return year + month // 12, month % 12 + 1
+
+
+def _month_days(year, month, rule, dtstart):
+    """Candidate days of one month for MONTHLY (or YEARLY with BYMONTH) rules."""
+    last = calendar.monthrange(year, month)[1]
+    days = None
+    if "BYDAY" in rule:
+        days = set()
+        for item in rule["BYDAY"].split(","):
+            ordinal, weekday = item[:-2], WEEKDAYS.get(item[-2:])
+            if weekday is None:
+                continue
+            matching = [d for d in range(1, last + 1) if date(year, month, d).weekday() == weekday]
+            if ordinal and ordinal not in ("+", "-"):
+                n = int(ordinal)
+                if -len(matching) <= n <= len(matching) and n != 0:
+                    days.add(matching[n - 1 if n > 0 else n])
+            else:
+                days.update(matching)
+    if "BYMONTHDAY" in rule:
+        wanted = set()
+        for item in rule["BYMONTHDAY"].split(","):
+            n = int(item)
+            if 1 <= abs(n) <= last:
+                wanted.add(n if n > 0 else last + n + 1)
+        days = wanted if days is None else days & wanted
+    if days is None:
+        days = {dtstart.day} if dtstart.day <= last else set()
+    return sorted(days)
+
+
+def _period(dtstart, rule, i):
+    """Sorted candidate starts of the ``i``-th period (before COUNT/UNTIL are applied)."""
+    freq = rule.get("FREQ")
+    interval = int(rule.get("INTERVAL", 1))
+    clock = dtstart.time()
+    if freq == "DAILY":
+        candidates = [dtstart + timedelta(days=i * interval)]
+    elif freq == "WEEKLY":
+        week = dtstart.date() - timedelta(days=dtstart.weekday()) + timedelta(weeks=i * interval)
+        weekdays = [WEEKDAYS[d[-2:]] for d in rule["BYDAY"].split(",") if d[-2:] in WEEKDAYS] if "BYDAY" in rule else [dtstart.weekday()]
+        candidates = [datetime.combine(week + timedelta(days=wd), clock) for wd in sorted(set(weekdays))]
+    elif freq == "MONTHLY":
+        year, month = _add_months(dtstart.year, dtstart.month, i * interval)
+        candidates = [datetime.combine(date(year, month, d), clock) for d in _month_days(year, month, rule, dtstart)]
+    elif freq == "YEARLY":
+        year = dtstart.year + i * interval
+        months = [int(m) for m in rule["BYMONTH"].split(",")] if "BYMONTH" in rule else [dtstart.month]
+        candidates = []
+        for month in sorted(months):
+            if "BYDAY" in rule or "BYMONTHDAY" in rule:
+                days = _month_days(year, month, rule, dtstart)
+            else:
+                days = [dtstart.day] if dtstart.day <= calendar.monthrange(year, month)[1] else []
+            candidates.extend(datetime.combine(date(year, month, d), clock) for d in days)
+    else:
+        return []
+
+    # BY* parts that only filter at this frequency
+    if "BYMONTH" in rule and freq != "YEARLY":
+        months = {int(m) for m in rule["BYMONTH"].split(",")}
+        candidates = [c for c in candidates if c.month in months]
+    if freq == "DAILY":
+        if "BYDAY" in rule:
+            weekdays = {WEEKDAYS[d[-2:]] for d in rule["BYDAY"].split(",") if d[-2:] in WEEKDAYS}
+            candidates = [c for c in candidates if c.weekday() in weekdays]
+        if "BYMONTHDAY" in rule:
+            monthdays = {int(d) for d in rule["BYMONTHDAY"].split(",")}
+            candidates = [
+                c for c in candidates
+                if c.day in monthdays or c.day - calendar.monthrange(c.year, c.month)[1] - 1 in monthdays
+            ]
+    if "BYSETPOS" in rule and candidates:
+        picked = set()
+        for pos in rule["BYSETPOS"].split(","):
+            n = int(pos)
+            if 1 <= abs(n) <= len(candidates):
+                picked.add(candidates[n - 1 if n > 0 else n])
+        candidates = sorted(picked)
+    return candidates
+
+
+def _periods_before(dtstart, rule, lo):
+    """Whole periods that end before ``lo`` — safe to skip when there is no COUNT."""
+    interval = int(rule.get("INTERVAL", 1))
+    freq = rule.get("FREQ")
+    if lo <= dtstart:
+        return 0
+    if freq == "DAILY":
+        n = (lo - dtstart).days // interval
+    elif freq == "WEEKLY":
+        n = (lo - dtstart).days // (7 * interval)
+    elif freq == "MONTHLY":
+        n = ((lo.year - dtstart.year) * 12 + lo.month - dtstart.month) // interval
+    elif freq == "YEARLY":
+        n = (lo.year - dtstart.year) // interval
+    else:
+        return 0
+    return max(0, n - 1)
+
+
+def _expand(dtstart, rule, lo, hi, tz=None):
+    """Yield starts of ``rule`` from ``dtstart`` falling within ``[lo, hi]`` (naive wall time).
+
+    ``tz`` is the event's index tz; a UTC UNTIL is moved into that wall
+    clock before it is compared with the occurrences.
+    """
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = None
+    if "UNTIL" in rule:
+        until, until_tz = _parse_dt(rule["UNTIL"], {})
+        if until_tz == "DATE":
+            until = datetime.combine(until, datetime.max.time())
+        elif until_tz == "UTC" and tz != "UTC":
+            zone = _zone(None if tz == "DATE" else tz)
+            until = until.replace(tzinfo=timezone.utc)
+            until = (until.astimezone(zone) if zone else until.astimezone()).replace(tzinfo=None)
+    # COUNT has to be counted from the first occurrence; otherwise jump ahead
+    i = 0 if count is not None else _periods_before(dtstart, rule, lo)
+    seen = 0
+    while True:
+        candidates = _period(dtstart, rule, i)
+        i += 1
+        if not candidates:
+            if _period_start(dtstart, rule, i) > hi:
+                return
+            continue
+        for start in candidates:
+            if start < dtstart:
+                continue
+            if (until and start > until) or start > hi:
+                return
+            seen += 1
+            if count is not None and seen > count:
+                return
+            if start >= lo:
+                yield start
+
+
+def _period_start(dtstart, rule, i):
+    """Earliest instant period ``i`` could contain, to stop on empty periods."""
+    interval = int(rule.get("INTERVAL", 1))
+    freq = rule.get("FREQ")
+    if freq == "DAILY":
+        return dtstart + timedelta(days=i * interval)
+    if freq == "WEEKLY":
+        return dtstart + timedelta(weeks=i * interval - 1)
+    if freq == "MONTHLY":
+        year, month = _add_months(dtstart.year, dtstart.month, i * interval)
+        return datetime(year, month, 1)
+    if freq == "YEARLY":
+        return datetime(dtstart.year + i * interval, 1, 1)
+    return datetime.max
+
+
+def _as_event(record, start, all_day):
+    """Google Calendar–shaped event so ICS and API results format alike."""
+    duration = timedelta(seconds=record["duration"])
+    if all_day:
+        return {
+            "summary": record["summary"],
+            "location": record["location"],
+            "start": {"date": start.date().isoformat()},
+            "end": {"date": (start + duration).date().isoformat()},
+        }
+    return {
+        "summary": record["summary"],
+        "location": record["location"],
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + duration).isoformat()},
+    }
+
+
+def ics_events(path, start, end, use_cache=True):
+    """Yield events from the .ics file at ``path`` overlapping ``[start, end)``.
+
+    ``start``/``end`` are aware datetimes; all-day events are local days,
+    like the Google path. Raises OSError if the file can't be read.
+    """
+    index = load_index(path, use_cache)
+    lo_ts = start.timestamp()
+    stop = bisect.bisect_left(index["starts"], end.timestamp())
+    for record in index["events"][:stop]:
+        if record["boundEnd"] is not None and record["boundEnd"] < lo_ts:
+            continue
+        all_day = record["tz"] == "DATE"
+        tz = None if all_day else record["tz"]
+        first = datetime.fromisoformat(record["start"])
+        duration = timedelta(seconds=record["duration"])
+
+        if "rrule" in record:
+            # Expand in the event's own wall clock so DST shifts are right
+            zone = _zone(tz)
+            lo = (start.astimezone(zone) if zone else start.astimezone()).replace(tzinfo=None) - duration - timedelta(days=1)
+            hi = (end.astimezone(zone) if zone else end.astimezone()).replace(tzinfo=None) + timedelta(days=1)
+            skip = set(record.get("exdates", ())) | set(index["overrides"].get(record["uid"], ()))
+            walls = (w for w in _expand(first, record["rrule"], lo, hi, record["tz"]) if _instant_key(w, record["tz"]) not in skip)
+        else:
+            walls = [first]
+
+        for wall in walls:
+            occurrence = _aware(wall, tz)
+            # Zero-length events (reminders, deadlines) count if they start inside
+            if occurrence < end and (occurrence + duration > start or (not duration and occurrence >= start)):
+                yield _as_event(record, occurrence, all_day)
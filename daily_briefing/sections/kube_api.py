@@ -0,0 +1,343 @@
+"""Minimal Kubernetes API client — kubeconfig loading, paginated LIST and watch calls.
+
+Talks to the API server directly over one kept-alive HTTP(S) connection so
+the Kubernetes section doesn't have to spawn kubectl and hold an entire
+``-o json`` dump in memory. Only what the section needs is supported:
+bearer tokens (inline, file or exec plugin), client certificates and basic
+auth.
+"""
+
+import base64
+import gzip
+import http.client
+import json
+import os
+import socket
+import ssl
+import subprocess
+import tempfile
+import time
+import urllib.parse
+from pathlib import Path
+
+from ..runner import process_slot, subprocess_run
+
+DEFAULT_KUBECONFIG = Path.home() / ".kube" / "config"
+PAGE_SIZE = 500
+
+
+class KubeConfigError(Exception):
+    """The kubeconfig is missing, unreadable or uses unsupported auth."""
+
+
+class KubeAPIError(Exception):
+    """The API server answered with a non-2xx status."""
+
+    def __init__(self, status, message):
+        super().__init__(f"API server returned {status}: {message}")
+        self.status = status
+
+
+def _kubeconfig_path():
+    env = os.environ.get("KUBECONFIG")
+    if env:
+        for p in env.split(os.pathsep):
+            if p and Path(p).expanduser().exists():
+                return Path(p).expanduser()
+        raise KubeConfigError(f"No kubeconfig found in KUBECONFIG={env}")
+    if DEFAULT_KUBECONFIG.exists():
+        return DEFAULT_KUBECONFIG
+    raise KubeConfigError(f"No kubeconfig at {DEFAULT_KUBECONFIG}")
+
+
+def _parse_kubeconfig(text):
+    """Kubeconfigs are YAML; JSON ones parse without any dependency."""
+    if text.lstrip().startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise KubeConfigError(f"Invalid kubeconfig: {e}")
+    try:
+        import yaml
+    except ImportError:
+        raise KubeConfigError("PyYAML is needed to read a YAML kubeconfig (pip install pyyaml)")
+    try:
+        return yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise KubeConfigError(f"Invalid kubeconfig: {e}")
+
+
+def _named(entries, name, kind):
+    for entry in entries or []:
+        if entry.get("name") == name:
+            return entry.get(kind) or {}
+    raise KubeConfigError(f"{kind} {name!r} not found in kubeconfig")
+
+
+def _exec_credential(spec, base_dir):
+    """Run a client-go exec credential plugin and return its ``status``."""
+    cmd = [spec["command"]] + list(spec.get("args") or [])
+    if not os.path.isabs(cmd[0]) and os.sep in cmd[0]:
+        cmd[0] = str(base_dir / cmd[0])
+    env = dict(os.environ)
+    for item in spec.get("env") or []:
+        env[item["name"]] = item["value"]
+    try:
+        with process_slot():
+            result = subprocess_run(cmd, capture_output=True, text=True, timeout=30, env=env)
+    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        raise KubeConfigError(f"exec credential plugin failed: {e}")
+    if result.returncode != 0:
+        raise KubeConfigError(f"exec credential plugin failed: {result.stderr.strip()}")
+    try:
+        return json.loads(result.stdout).get("status") or {}
+    except json.JSONDecodeError:
+        raise KubeConfigError("exec credential plugin returned invalid JSON")
+
+
+def list_contexts():
+    """Names of all contexts in the kubeconfig. Raises KubeConfigError."""
+    path = _kubeconfig_path()
+    try:
+        config = _parse_kubeconfig(path.read_text())
+    except OSError as e:
+        raise KubeConfigError(str(e))
+    return [c["name"] for c in config.get("contexts") or [] if c.get("name")]
+
+
+def load_kubeconfig(context=None):
+    """Resolve server, TLS and credentials for ``context`` (default: current).
+
+    Returns a flat dict consumed by KubeClient. Raises KubeConfigError.
+    """
+    path = _kubeconfig_path()
+    base_dir = path.parent
+    try:
+        config = _parse_kubeconfig(path.read_text())
+    except OSError as e:
+        raise KubeConfigError(str(e))
+
+    context = context or config.get("current-context")
+    if not context:
+        raise KubeConfigError("kubeconfig has no current-context")
+    ctx = _named(config.get("contexts"), context, "context")
+    cluster = _named(config.get("clusters"), ctx.get("cluster"), "cluster")
+    user = _named(config.get("users"), ctx.get("user"), "user") if ctx.get("user") else {}
+
+    def relative(name):
+        p = Path(name).expanduser()
+        return p if p.is_absolute() else base_dir / p
+
+    def data_or_file(data_key, file_key, source):
+        if source.get(data_key):
+            return base64.b64decode(source[data_key])
+        if source.get(file_key):
+            return relative(source[file_key]).read_bytes()
+        return None
+
+    try:
+        resolved = {
+            "context": context,
+            "server": cluster.get("server", "").rstrip("/"),
+            "insecure": bool(cluster.get("insecure-skip-tls-verify")),
+            "ca": data_or_file("certificate-authority-data", "certificate-authority", cluster),
+            "cert": data_or_file("client-certificate-data", "client-certificate", user),
+            "key": data_or_file("client-key-data", "client-key", user),
+            "token": user.get("token"),
+            "basic": None,
+        }
+        if not resolved["token"] and user.get("tokenFile"):
+            resolved["token"] = relative(user["tokenFile"]).read_text().strip()
+    except OSError as e:
+        raise KubeConfigError(f"Can't read credentials for context {context!r}: {e}")
+
+    if user.get("username") and user.get("password"):
+        resolved["basic"] = (user["username"], user["password"])
+    if user.get("exec"):
+        status = _exec_credential(user["exec"], base_dir)
+        resolved["token"] = status.get("token") or resolved["token"]
+        if status.get("clientCertificateData"):
+            resolved["cert"] = status["clientCertificateData"].encode()
+            resolved["key"] = status.get("clientKeyData", "").encode()
+    if user.get("auth-provider"):
+        raise KubeConfigError("auth-provider credentials are not supported by the built-in client")
+    if not resolved["server"]:
+        raise KubeConfigError(f"cluster for context {context!r} has no server")
+    return resolved
+
+
+def _ssl_context(config):
+    ctx = ssl.create_default_context()
+    if config["insecure"]:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    elif config["ca"]:
+        ctx.load_verify_locations(cadata=config["ca"].decode())
+    if config["cert"] and config["key"]:
+        # load_cert_chain only accepts paths, so stage the PEMs briefly
+        with tempfile.TemporaryDirectory() as tmp:
+            cert_path = os.path.join(tmp, "cert.pem")
+            key_path = os.path.join(tmp, "key.pem")
+            with open(os.open(cert_path, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as f:
+                f.write(config["cert"])
+            with open(os.open(key_path, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as f:
+                f.write(config["key"])
+            ctx.load_cert_chain(cert_path, key_path)
+    return ctx
+
+
+class KubeClient:
+    """A kept-alive connection to one API server.
+
+    Requests are issued sequentially over the same connection, which is
+    reopened once if the server closed it between requests. ``timeout``
+    bounds the client's whole lifetime, not just each socket operation:
+    once it has passed, the connection is closed and every call raises
+    TimeoutError, however slowly the server keeps sending.
+    """
+
+    def __init__(self, config, timeout=15):
+        self.config = config
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+        url = urllib.parse.urlsplit(config["server"])
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip("/")
+        self.headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "User-Agent": "daily-briefing/2.0",
+        }
+        if config["token"]:
+            self.headers["Authorization"] = f"Bearer {config['token']}"
+        elif config["basic"]:
+            raw = ":".join(config["basic"]).encode()
+            self.headers["Authorization"] = "Basic " + base64.b64encode(raw).decode()
+        self._ssl = _ssl_context(config) if self.scheme == "https" else None
+        self._conn = None
+        self._sock = None
+
+    def _remaining(self):
+        """Seconds left before the deadline; closes the connection and raises once it passes."""
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            self.close()
+            raise TimeoutError(f"API server did not answer within {self.timeout:g}s")
+        return remaining
+
+    def _connect(self):
+        timeout = min(self.timeout, self._remaining())
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=timeout, context=self._ssl
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _request(self, path, params=None, headers=None):
+        query = f"?{urllib.parse.urlencode(params)}" if params else ""
+        url = f"{self.prefix}{path}{query}"
+        for attempt in (0, 1):
+            if self._conn is None:
+                self._conn = self._connect()
+            elif self._conn.sock is not None:
+                self._conn.sock.settimeout(min(self.timeout, self._remaining()))
+            try:
+                self._conn.request("GET", url, headers=headers or self.headers)
+                # getresponse drops conn.sock when the server will close, so
+                # keep it for adjusting the timeout while the body is read
+                self._sock = self._conn.sock
+                return self._conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Kept-alive connection went away between requests — retry once
+                self.close()
+                if attempt:
+                    raise
+            except socket.timeout:
+                self._remaining()
+                raise
+
+    def _chunks(self, resp, idle=None):
+        """Yield the body of ``resp`` as it arrives, checking the deadline between reads.
+
+        With ``idle``, a gap of that many seconds without data ends the body
+        early instead of raising.
+        """
+        while True:
+            remaining = self._remaining()
+            self._sock.settimeout(min(idle, remaining) if idle else remaining)
+            try:
+                chunk = resp.read1(65536)
+            except socket.timeout:
+                self._remaining()  # raises if this was the deadline
+                if idle:
+                    return
+                raise
+            if not chunk:
+                # read1 leaves a Content-Length response open at its end,
+                # which would keep the connection from being reused
+                resp.close()
+                return
+            yield chunk
+
+    @staticmethod
+    def _raise_for_status(resp, body):
+        if resp.status >= 300:
+            try:
+                message = json.loads(body).get("message", "")
+            except ValueError:
+                message = body[:200].decode(errors="replace")
+            raise KubeAPIError(resp.status, message)
+
+    def get_json(self, path, params=None):
+        """GET ``path`` and decode the JSON body. Raises KubeAPIError or TimeoutError."""
+        resp = self._request(path, params)
+        body = b"".join(self._chunks(resp))
+        if resp.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self._raise_for_status(resp, body)
+        return json.loads(body)
+
+    def list_pages(self, path, params=None, limit=PAGE_SIZE):
+        """Yield the ``items`` of each page of a LIST, following ``continue``.
+
+        Only one page is decoded and alive at a time, so memory stays
+        bounded by ``limit`` rather than by the size of the collection.
+        """
+        params = dict(params or {}, limit=limit)
+        while True:
+            page = self.get_json(path, params)
+            yield page.get("items") or []
+            token = (page.get("metadata") or {}).get("continue")
+            if not token:
+                return
+            params["continue"] = token
+
+    def watch(self, path, params=None, idle=None):
+        """Yield decoded watch events for ``path`` as they arrive.
+
+        Ends when the server closes the watch or, with ``idle``, once no
+        event has arrived for that many seconds. The connection can't be
+        reused after a watch, so it is closed either way.
+        """
+        params = dict(params or {}, watch="true")
+        headers = dict(self.headers)
+        headers.pop("Accept-Encoding")
+        resp = self._request(path, params, headers)
+        try:
+            if resp.status >= 300:
+                self._raise_for_status(resp, b"".join(self._chunks(resp)))
+            buf = b""
+            for chunk in self._chunks(resp, idle):
+                *lines, buf = (buf + chunk).split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+        finally:
+            self.close()
@@ -0,0 +1,184 @@
+"""Incremental Kubernetes state — a cached LIST kept current with watches.
+
+The projected items of a resource are stored together with the
+``resourceVersion`` they were listed at. The next run opens a short watch
+from that version and applies only the ADDED/MODIFIED/DELETED events since
+then; when the server has compacted that version away (410 Gone) the
+resource is listed from scratch instead.
+
+Works over KubeClient or, via KubectlRaw, over ``kubectl get --raw``.
+"""
+
+import json
+import os
+import re
+import select
+import subprocess
+import time
+import urllib.parse
+
+from ..runner import process_slot, subprocess_run, tracked
+from .kube_api import PAGE_SIZE, KubeAPIError
+
+STATE_VERSION = 1
+WATCH_IDLE = 1.0  # seconds without events after which a watch has caught up
+
+
+def state_file(context):
+    """Cache file name for ``context``; context names may contain ``/`` and ``:``."""
+    return f"kube-state-{re.sub(r'[^A-Za-z0-9_.-]', '_', context)}.json"
+
+
+class KubectlRaw:
+    """``kubectl get --raw`` behind the same get_json/watch calls as KubeClient.
+
+    As with KubeClient, ``timeout`` bounds the whole lifetime of the
+    transport rather than each kubectl call: every call only gets what is
+    left of it, and once it has passed calls raise TimeoutError.
+    """
+
+    def __init__(self, kubectl, timeout=15):
+        self.kubectl = kubectl
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+
+    def close(self):
+        pass
+
+    def _remaining(self):
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"kubectl did not answer within {self.timeout:g}s")
+        return remaining
+
+    @staticmethod
+    def _url(path, params):
+        return f"{path}?{urllib.parse.urlencode(params)}" if params else path
+
+    @staticmethod
+    def _error(stderr):
+        # kubectl reports statuses by reason: "Error from server (Expired): ..."
+        message = stderr.strip() or "kubectl failed"
+        if "(Expired)" in message or "(Gone)" in message:
+            return KubeAPIError(410, message)
+        return OSError(message)
+
+    def get_json(self, path, params=None):
+        try:
+            with process_slot():
+                result = subprocess_run(
+                    self.kubectl + ["get", "--raw", self._url(path, params)],
+                    capture_output=True,
+                    timeout=self._remaining(),
+                )
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"kubectl did not answer within {self.timeout:g}s")
+        except FileNotFoundError as e:
+            raise OSError(str(e))
+        if result.returncode != 0:
+            raise self._error(result.stderr.decode(errors="replace"))
+        return json.loads(result.stdout)
+
+    def watch(self, path, params=None, idle=None):
+        params = dict(params or {}, watch="true")
+        with process_slot():
+            try:
+                proc = subprocess.Popen(
+                    self.kubectl + ["get", "--raw", self._url(path, params)],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            except FileNotFoundError as e:
+                raise OSError(str(e))
+            with tracked(proc):
+                fd = proc.stdout.fileno()
+                buf = b""
+                try:
+                    while True:
+                        remaining = self._remaining()
+                        wait = min(idle, remaining) if idle else remaining
+                        ready, _, _ = select.select([fd], [], [], wait)
+                        if not ready:
+                            self._remaining()  # raises if this was the deadline
+                            return
+                        chunk = os.read(fd, 65536)
+                        if not chunk:
+                            break
+                        *lines, buf = (buf + chunk).split(b"\n")
+                        for line in lines:
+                            if line.strip():
+                                yield json.loads(line)
+                    if proc.wait() != 0:
+                        raise self._error(proc.stderr.read().decode(errors="replace"))
+                finally:
+                    if proc.poll() is None:
+                        proc.kill()
+                        proc.wait()
+                    proc.stdout.close()
+                    proc.stderr.close()
+
+
+def _relist(transport, path, project, key):
+    """Full paginated LIST; the first page's resourceVersion pins the snapshot."""
+    items = {}
+    params = {"limit": PAGE_SIZE}
+    version = None
+    while True:
+        page = transport.get_json(path, params)
+        meta = page.get("metadata") or {}
+        version = version or meta.get("resourceVersion")
+        for obj in page.get("items") or []:
+            item = project(obj)
+            items[key(item)] = item
+        if not meta.get("continue"):
+            return {"resourceVersion": version, "items": items}
+        params["continue"] = meta["continue"]
+
+
+def _catch_up(transport, path, project, key, state, seconds):
+    """Apply watch events since the stored resourceVersion.
+
+    Every event carries its own resourceVersion, so the watch can stop
+    after any of them and still leave a consistent state behind.
+    """
+    items = state["items"]
+    version = state["resourceVersion"]
+    params = {
+        "resourceVersion": version,
+        "allowWatchBookmarks": "true",
+        "timeoutSeconds": max(1, int(seconds)),
+    }
+    deadline = time.monotonic() + seconds
+    changes = 0
+    for event in transport.watch(path, params, idle=WATCH_IDLE):
+        kind = event.get("type")
+        obj = event.get("object") or {}
+        if kind == "ERROR":
+            raise KubeAPIError(obj.get("code", 500), obj.get("message", ""))
+        version = (obj.get("metadata") or {}).get("resourceVersion") or version
+        if kind in ("ADDED", "MODIFIED"):
+            item = project(obj)
+            items[key(item)] = item
+            changes += 1
+        elif kind == "DELETED":
+            items.pop(key(project(obj)), None)
+            changes += 1
+        if time.monotonic() >= deadline:
+            break
+    return {"resourceVersion": version, "items": items}, changes
+
+
+def sync(transport, path, project, key, state, seconds):
+    """Bring a stored ``{"resourceVersion", "items"}`` state up to date.
+
+    Returns ``(state, how)`` where ``how`` says whether it was a watch
+    catch-up or a fresh LIST (no usable state, or 410 Gone).
+    """
+    if state and state.get("resourceVersion") and isinstance(state.get("items"), dict):
+        try:
+            state, changes = _catch_up(transport, path, project, key, state, seconds)
+            return state, f"watch ({changes} change{'s' if changes != 1 else ''})"
+        except KubeAPIError as e:
+            if e.status != 410:
+                raise
+    return _relist(transport, path, project, key), "list"
@@ -1,99 +1,473 @@
 """Kubernetes section — pod health, node status, restart loops."""
 
+import heapq
 import json
+import queue
 import subprocess
 import shutil
+import tempfile
+import threading
+import time
 
+from ..cache import load_json, save_json
+from ..runner import carry_children, process_slot, run as _run, tracked
+from . import kube_state
+from .kube_api import KubeAPIError, KubeClient, KubeConfigError, list_contexts, load_kubeconfig
 
-def _run(cmd, timeout=15):
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        if result.returncode != 0:
-            return "", result.stderr.strip()
-        return result.stdout.strip(), None
-    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-        return "", str(e)
+HEALTHY_PHASES = {"Running", "Succeeded", "Completed"}
+RESTART_THRESHOLD = 5
+TOP_N = 25  # offenders of each kind kept for the report
+WATCH_SECONDS = 5  # upper bound on each --kube-cache watch catch-up
 
+# kubectl can't ask the server for fewer fields, but it can print only the
+# ones we read: one tab-separated line per object instead of full JSON
+POD_JSONPATH = (
+    "{range .items[*]}"
+    '{.metadata.namespace}{"\\t"}{.metadata.name}{"\\t"}{.status.phase}{"\\t"}'
+    '{range .status.containerStatuses[*]}{.name}{"="}{.restartCount}{","}{end}'
+    '{"\\n"}{end}'
+)
+NODE_JSONPATH = (
+    "{range .items[*]}"
+    '{.metadata.name}{"\\t"}{.status.conditions[?(@.type=="Ready")].status}{"\\t"}'
+    '{.metadata.labels}{"\\n"}{end}'
+)
 
-def get_kubernetes(args):
-    # Check if kubectl is available
-    if not shutil.which("kubectl"):
-        return {"available": False, "note": "kubectl not installed — skipping Kubernetes"}
 
-    info = {"available": True}
+class _CommandError(Exception):
+    pass
+
+
+def _stream(cmd, timeout=15):
+    """Yield stdout lines of ``cmd`` as they arrive.
+
+    The process is killed if it runs past ``timeout``; a non-zero exit
+    raises _CommandError with its stderr once the output is exhausted.
+    """
+    with tempfile.TemporaryFile() as stderr, process_slot():
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        except FileNotFoundError as e:
+            raise _CommandError(str(e))
+        with tracked(proc):
+            timer = threading.Timer(timeout, proc.kill)
+            timer.start()
+            try:
+                yield from proc.stdout
+                proc.wait()
+            finally:
+                timer.cancel()
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                proc.stdout.close()
+        if proc.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise _CommandError(message or f"{cmd[0]} timed out after {timeout}s")
+
+
+def _in_background(fn, *args):
+    """Start ``fn`` in a daemon thread; returns a queue that gets ``(result, error)``.
+
+    Unlike an executor worker, a daemon thread is never joined at exit,
+    so a query that outlives its deadline can simply be abandoned.
+    """
+    results = queue.Queue(maxsize=1)
+
+    def target():
+        try:
+            results.put((fn(*args), None))
+        except Exception as e:
+            results.put((None, e))
+
+    threading.Thread(target=carry_children(target), daemon=True).start()
+    return results
 
-    # Get all pods as JSON
-    out, err = _run(["kubectl", "get", "pods", "--all-namespaces", "-o", "json"])
-    if err:
-        return {"available": True, "error": err}
 
+def _wait(results, deadline):
+    """The result of an _in_background call; TimeoutError once ``deadline`` passes."""
     try:
-        pods = json.loads(out)
-    except json.JSONDecodeError:
-        return {"available": True, "error": "Failed to parse kubectl output"}
+        result, error = results.get(timeout=max(0.0, deadline - time.monotonic()))
+    except queue.Empty:
+        raise TimeoutError("timed out")
+    if error is not None:
+        raise error
+    return result
 
-    items = pods.get("items", [])
-    info["totalPods"] = len(items)
 
-    # Healthy states
-    healthy_phases = {"Running", "Succeeded", "Completed"}
-    unhealthy = [
-        p for p in items
-        if p.get("status", {}).get("phase", "") not in healthy_phases
-    ]
-    info["unhealthyPods"] = [
-        {
-            "name": p.get("metadata", {}).get("name"),
-            "namespace": p.get("metadata", {}).get("namespace"),
-            "phase": p.get("status", {}).get("phase"),
-        }
-        for p in unhealthy
+def _project_pod(pod):
+    """Reduce a full pod object to ``(namespace, name, phase, containers)``."""
+    meta = pod.get("metadata", {})
+    status = pod.get("status", {})
+    containers = [
+        (c.get("name"), c.get("restartCount", 0))
+        for c in status.get("containerStatuses", [])
     ]
-    info["unhealthyCount"] = len(unhealthy)
-
-    # Check for restart loops (>5 restarts)
-    restart_issues = []
-    for pod in items:
-        for c in pod.get("status", {}).get("containerStatuses", []):
-            restarts = c.get("restartCount", 0)
-            if restarts > 5:
-                restart_issues.append({
-                    "pod": pod.get("metadata", {}).get("name"),
-                    "namespace": pod.get("metadata", {}).get("namespace"),
-                    "container": c.get("name"),
+    return meta.get("namespace"), meta.get("name"), status.get("phase", ""), containers
+
+
+def _parse_pod_line(line):
+    """Parse one POD_JSONPATH line into the same tuple as _project_pod."""
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) < 3:
+        return None
+    containers = []
+    for item in parts[3].split(",") if len(parts) > 3 else []:
+        name, _, restarts = item.partition("=")
+        if name:
+            containers.append((name, int(restarts) if restarts.isdigit() else 0))
+    return parts[0], parts[1], parts[2], containers
+
+
+class _PodAggregator:
+    """Single-pass pod health tally with bounded memory.
+
+    Keeps counters, per-namespace tallies and the TOP_N worst offenders of
+    each kind in min-heaps, so memory depends on how many offenders are
+    reported rather than on how many pods stream past. Offenders rank by
+    restart count, earlier pods winning ties.
+    """
+
+    def __init__(self, top_n=TOP_N):
+        self.top_n = top_n
+        self.total = 0
+        self.unhealthy_count = 0
+        self.restart_count = 0
+        self.namespaces = {}
+        self._unhealthy = []
+        self._restarts = []
+        self._seq = 0
+
+    def _keep(self, heap, rank, item):
+        # The unique sequence number breaks ties before the dicts are compared
+        entry = (rank, -self._seq, item)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, namespace, name, phase, containers):
+        self.total += 1
+        self._seq += 1
+        tally = self.namespaces.get(namespace)
+        if tally is None:
+            tally = self.namespaces[namespace] = [0, 0, 0]
+        tally[0] += 1
+
+        if phase not in HEALTHY_PHASES:
+            self.unhealthy_count += 1
+            tally[1] += 1
+            restarts = sum(r for _, r in containers)
+            self._keep(self._unhealthy, restarts, {"name": name, "namespace": namespace, "phase": phase})
+
+        # Check for restart loops (>5 restarts)
+        for container, restarts in containers:
+            if restarts > RESTART_THRESHOLD:
+                self.restart_count += 1
+                tally[2] += 1
+                self._keep(self._restarts, restarts, {
+                    "pod": name,
+                    "namespace": namespace,
+                    "container": container,
                     "restarts": restarts,
                 })
-    info["restartIssues"] = restart_issues
-    info["restartIssueCount"] = len(restart_issues)
 
-    # Node status
-    out, err = _run(["kubectl", "get", "nodes", "-o", "json"])
-    if not err and out:
+    def summary(self, info):
+        info["totalPods"] = self.total
+        info["unhealthyPods"] = [item for _, _, item in sorted(self._unhealthy, reverse=True)]
+        info["unhealthyCount"] = self.unhealthy_count
+        info["restartIssues"] = [item for _, _, item in sorted(self._restarts, reverse=True)]
+        info["restartIssueCount"] = self.restart_count
+        # Only namespaces with something wrong; healthy ones just add noise
+        info["namespaces"] = {
+            ns: {"pods": pods, "unhealthy": unhealthy, "restartIssues": restarting}
+            for ns, (pods, unhealthy, restarting) in sorted(self.namespaces.items())
+            if unhealthy or restarting
+        }
+
+
+def _summarize_pods(pods, info):
+    """Tally pod health from ``(namespace, name, phase, [(container, restarts)])``.
+
+    Both backends stream these tuples in, so full pod objects never pile up.
+    """
+    aggregator = _PodAggregator()
+    for pod in pods:
+        aggregator.add(*pod)
+    aggregator.summary(info)
+
+
+def _project_node(node):
+    """Reduce a full node object to ``(name, ready, labels)``."""
+    conditions = node.get("status", {}).get("conditions", [])
+    ready = next((c for c in conditions if c.get("type") == "Ready"), None)
+    return (
+        node.get("metadata", {}).get("name"),
+        ready.get("status") == "True" if ready else False,
+        node.get("metadata", {}).get("labels", {}),
+    )
+
+
+def _parse_node_line(line):
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) < 3:
+        return None
+    try:
+        labels = json.loads(parts[2]) if parts[2] else {}
+    except json.JSONDecodeError:
+        labels = {}
+    return parts[0], parts[1] == "True", labels
+
+
+def _summarize_nodes(nodes, info):
+    info["nodes"] = []
+    for name, ready, labels in nodes:
+        roles = [
+            l.replace("node-role.kubernetes.io/", "")
+            for l in labels
+            if l.startswith("node-role.kubernetes.io/")
+        ]
+        info["nodes"].append({"name": name, "ready": ready, "roles": roles})
+    info["nodeCount"] = len(info["nodes"])
+    info["nodesReady"] = len([n for n in info["nodes"] if n["ready"]])
+
+
+def _api_nodes(client):
+    """Node summary over ``client``'s connection; empty if nodes can't be listed."""
+    info = {}
+    try:
+        nodes = (_project_node(node) for page in client.list_pages("/api/v1/nodes") for node in page)
+        _summarize_nodes(nodes, info)
+    except (KubeAPIError, OSError, ValueError):
+        # e.g. RBAC forbids listing nodes — report pods only
+        return {}
+    return info
+
+
+def _from_api(config, timeout=15):
+    """Query the API server directly, one page of pods at a time.
+
+    The API has no field selection for LIST (the Table representation
+    drops phase and per-container restarts), so pages are fetched
+    gzip-compressed and projected down to tuples as soon as each is decoded.
+    Nodes are listed concurrently over a second connection.
+    """
+    info = {"available": True, "source": "api"}
+    nodes_client = KubeClient(config, timeout=timeout)
+    try:
+        nodes = _in_background(_api_nodes, nodes_client)
+        client = KubeClient(config, timeout=timeout)
         try:
-            nodes = json.loads(out)
-            info["nodes"] = []
-            for n in nodes.get("items", []):
-                conditions = n.get("status", {}).get("conditions", [])
-                ready = next((c for c in conditions if c.get("type") == "Ready"), None)
-                labels = n.get("metadata", {}).get("labels", {})
-                roles = [
-                    l.replace("node-role.kubernetes.io/", "")
-                    for l in labels
-                    if l.startswith("node-role.kubernetes.io/")
-                ]
-                info["nodes"].append({
-                    "name": n.get("metadata", {}).get("name"),
-                    "ready": ready.get("status") == "True" if ready else False,
-                    "roles": roles,
-                })
-            info["nodeCount"] = len(info["nodes"])
-            info["nodesReady"] = len([n for n in info["nodes"] if n["ready"]])
-        except (json.JSONDecodeError, KeyError):
-            pass
+            pods = (_project_pod(pod) for page in client.list_pages("/api/v1/pods") for pod in page)
+            _summarize_pods(pods, info)
+        finally:
+            client.close()
+        try:
+            info.update(_wait(nodes, nodes_client.deadline))
+        except TimeoutError:
+            pass  # nodes are optional; report pods only
+    finally:
+        nodes_client.close()
+    return info
+
+
+def _kubectl(context, timeout):
+    """kubectl command prefix, pinned to ``context`` when one is given."""
+    cmd = ["kubectl", f"--request-timeout={int(timeout)}s"]
+    if context:
+        cmd.append(f"--context={context}")
+    return cmd
 
+
+def _kubectl_nodes(kubectl, timeout):
+    info = {}
+    lines = _stream(kubectl + ["get", "nodes", "-o", f"jsonpath={NODE_JSONPATH}"], timeout)
+    try:
+        _summarize_nodes(filter(None, map(_parse_node_line, lines)), info)
+    except _CommandError:
+        return {}
+    return info
+
+
+def _from_kubectl(context=None, timeout=15):
+    info = {"available": True, "source": "kubectl"}
+    kubectl = _kubectl(context, timeout)
+
+    # Nodes run alongside the pod query rather than after it; _stream
+    # kills the node query's kubectl itself once the timeout passes
+    deadline = time.monotonic() + timeout
+    nodes = _in_background(_kubectl_nodes, kubectl, timeout)
+
+    # Pods, one compact line each, parsed as kubectl prints them
+    lines = _stream(kubectl + ["get", "pods", "--all-namespaces", "-o", f"jsonpath={POD_JSONPATH}"], timeout)
+    try:
+        _summarize_pods(filter(None, map(_parse_pod_line, lines)), info)
+    except _CommandError as e:
+        return {"available": True, "error": str(e)}
+    try:
+        info.update(_wait(nodes, deadline))
+    except TimeoutError:
+        pass  # nodes are optional; report pods only
+
+    return info
+
+
+# What --kube-cache keeps per resource: API path, projection, and item key
+CACHED_RESOURCES = {
+    "pods": ("/api/v1/pods", _project_pod, lambda p: f"{p[0]}/{p[1]}"),
+    "nodes": ("/api/v1/nodes", _project_node, lambda n: n[0]),
+}
+
+
+def _from_state_cache(make_transport, context, source, timeout):
+    """Pod and node health from the incremental state cache (``--kube-cache``).
+
+    Pods and nodes sync concurrently, each over its own transport. Nodes
+    are optional as elsewhere: if they can't be listed only pods are shown.
+    """
+    name = kube_state.state_file(context)
+    stored = load_json(name, {})
+    if stored.get("version") != kube_state.STATE_VERSION:
+        stored = {}
+    seconds = min(WATCH_SECONDS, timeout)
+
+    def sync(resource, transport):
+        path, project, key = CACHED_RESOURCES[resource]
+        return kube_state.sync(transport, path, project, key, stored.get(resource), seconds)
+
+    nodes_transport = make_transport()
+    try:
+        nodes = _in_background(sync, "nodes", nodes_transport)
+        transport = make_transport()
+        try:
+            pods, pods_how = sync("pods", transport)
+        finally:
+            transport.close()
+        try:
+            nodes, nodes_how = _wait(nodes, nodes_transport.deadline)
+        except (KubeAPIError, OSError, ValueError):
+            nodes, nodes_how = None, None
+    finally:
+        nodes_transport.close()
+
+    save_json(name, {"version": kube_state.STATE_VERSION, "pods": pods, "nodes": nodes})
+
+    info = {"available": True, "source": source, "cache": {"pods": pods_how}}
+    _summarize_pods(pods["items"].values(), info)
+    if nodes is not None:
+        info["cache"]["nodes"] = nodes_how
+        _summarize_nodes(nodes["items"].values(), info)
     return info
+
+
+def _query_cluster(mode, context=None, timeout=15, state_cache=False):
+    """Pod and node health for one cluster (``context`` None = current)."""
+    have_kubectl = shutil.which("kubectl") is not None
+
+    # The built-in client is preferred; kubectl remains the fallback when
+    # the kubeconfig can't be used directly or the API call fails.
+    config = None
+    if mode in ("auto", "api"):
+        try:
+            config = load_kubeconfig(context)
+        except (KubeConfigError, OSError, ValueError) as e:
+            if mode == "api":
+                return {"available": True, "error": str(e)}
+
+    if config is not None:
+        try:
+            if state_cache:
+                return _from_state_cache(
+                    lambda: KubeClient(config, timeout=timeout), config["context"], "api", timeout
+                )
+            return _from_api(config, timeout)
+        except (KubeAPIError, OSError, ValueError) as e:
+            if mode == "api" or not have_kubectl:
+                return {"available": True, "error": str(e)}
+
+    # Check if kubectl is available
+    if not have_kubectl:
+        return {"available": False, "note": "kubectl not installed — skipping Kubernetes"}
+
+    if state_cache:
+        if not context:
+            context, err = _run(["kubectl", "config", "current-context"])
+            if err:
+                return {"available": True, "error": err}
+        kubectl = _kubectl(context, timeout)
+        try:
+            return _from_state_cache(
+                lambda: kube_state.KubectlRaw(kubectl, timeout), context, "kubectl", timeout
+            )
+        except (KubeAPIError, OSError, ValueError) as e:
+            return {"available": True, "error": str(e)}
+
+    return _from_kubectl(context, timeout)
+
+
+def _resolve_contexts(requested):
+    """Expand ``--kube-contexts``; ``all`` means every context in the kubeconfig."""
+    if requested != ["all"]:
+        return requested
+    try:
+        return list_contexts()
+    except KubeConfigError:
+        out, err = _run(["kubectl", "config", "get-contexts", "-o", "name"])
+        return out.split() if not err else []
+
+
+def _fan_out(contexts, mode, timeout, state_cache=False):
+    """Query every context concurrently; returns results in ``contexts`` order.
+
+    Each cluster runs in its own daemon thread and all share one deadline,
+    so wall time tracks the slowest healthy cluster and a hung one is
+    abandoned (not joined) once the timeout passes.
+    """
+    results = queue.Queue()
+
+    def worker(ctx):
+        try:
+            results.put((ctx, _query_cluster(mode, ctx, timeout, state_cache)))
+        except Exception as e:
+            results.put((ctx, {"available": True, "error": str(e)}))
+
+    for ctx in contexts:
+        threading.Thread(target=carry_children(worker), args=(ctx,), daemon=True).start()
+
+    done = {}
+    deadline = time.monotonic() + timeout
+    while len(done) < len(contexts):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            ctx, info = results.get(timeout=remaining)
+        except queue.Empty:
+            break
+        done[ctx] = info
+
+    timed_out = {"available": True, "error": f"timed out after {timeout:g}s"}
+    return [dict(done.get(ctx, timed_out), context=ctx) for ctx in contexts]
+
+
+def get_kubernetes(args):
+    state_cache = args.kube_cache and not args.no_cache
+    if not args.kube_contexts:
+        return _query_cluster(args.kube_mode, timeout=args.kube_timeout, state_cache=state_cache)
+
+    contexts = _resolve_contexts(args.kube_contexts)
+    if not contexts:
+        return {"available": False, "note": "No Kubernetes contexts found — skipping Kubernetes"}
+
+    clusters = _fan_out(contexts, args.kube_mode, args.kube_timeout, state_cache)
+    reachable = [c for c in clusters if c.get("available") and not c.get("error")]
+    return {
+        "available": True,
+        "clusters": clusters,
+        "clusterCount": len(clusters),
+        "clustersReachable": len(reachable),
+        "totalPods": sum(c.get("totalPods", 0) for c in reachable),
+        "unhealthyCount": sum(c.get("unhealthyCount", 0) for c in reachable),
+        "restartIssueCount": sum(c.get("restartIssueCount", 0) for c in reachable),
+    }
@@ -1,21 +1,325 @@
 """System health section — uptime, load, memory, disk usage."""
 
+import heapq
+import math
 import os
-import subprocess
-import shutil
+import re
+import statistics
+import threading
+import time
+from array import array
 
+from .system_history import record_and_compare
 
-def _run(cmd, timeout=5):
+# Filesystems with nothing on disk to report (df -x tmpfs -x devtmpfs -x
+# overlay, plus the kernel's virtual filesystems)
+PSEUDO_FS = {
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs",
+    "devpts", "devtmpfs", "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs",
+    "overlay", "proc", "pstore", "ramfs", "rpc_pipefs", "securityfs", "selinuxfs",
+    "squashfs", "sysfs", "tmpfs", "tracefs",
+}
+DISK_WARN_PERCENT = 80
+HOT_CORE_PERCENT = 90
+MAX_HOT_CORES = 16  # hot core ids listed; hotCount has the full number
+SECTOR_BYTES = 512  # /proc/diskstats always counts 512-byte sectors
+TOP_SAMPLE_SECONDS = 1.0  # shortest window --top measures CPU over
+
+
+def _unescape_mount(path):
+    # mountinfo escapes space, tab, newline and backslash as octal (\040)
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), path)
+
+
+def _mounts():
+    """Real filesystems from /proc/self/mountinfo, one per device.
+
+    Bind mounts of the same device are reported once, preferring the
+    mount of the filesystem root and then the shortest path.
+    """
+    by_device = {}
+    with open("/proc/self/mountinfo") as f:
+        for line in f:
+            left, _, right = line.partition(" - ")
+            fields = left.split()
+            fstype = right.split(" ", 1)[0]
+            if len(fields) < 5 or fstype in PSEUDO_FS:
+                continue
+            device, root, mount = fields[2], fields[3], _unescape_mount(fields[4])
+            rank = (root != "/", len(mount))
+            if device not in by_device or rank < by_device[device][0]:
+                by_device[device] = (rank, mount, fstype)
+    return sorted((mount, fstype) for _, mount, fstype in by_device.values())
+
+
+def _human(n):
+    """Bytes in df -h style: powers of 1024, rounded up, one decimal below 10."""
+    for unit in ("B", "K", "M", "G", "T", "P"):
+        if n < 1024 or unit == "P":
+            break
+        n /= 1024
+    if unit == "B":
+        return f"{int(n)}B"
+    if n < 10 and math.ceil(n * 10) < 100:
+        return f"{math.ceil(n * 10) / 10:.1f}{unit}"
+    return f"{math.ceil(n)}{unit}"
+
+
+def _statvfs_all(mounts, timeout):
+    """statvfs every mount concurrently, each with its own timeout.
+
+    Calls run in daemon threads: a hung network mount can't be
+    interrupted, but it is reported as unresponsive and never joined, so
+    it holds up neither the other disks nor interpreter exit.
+    """
+    results = {}
+
+    def probe(mount):
+        try:
+            results[mount] = os.statvfs(mount)
+        except OSError as e:
+            results[mount] = e
+
+    threads = []
+    for mount, _ in mounts:
+        t = threading.Thread(target=probe, args=(mount,), daemon=True)
+        t.start()
+        threads.append((t, time.monotonic() + timeout))
+    for t, deadline in threads:
+        t.join(max(0, deadline - time.monotonic()))
+    return dict(results)
+
+
+def _disk_usage(timeout):
+    mounts = _mounts()
+    stats = _statvfs_all(mounts, timeout)
+    disks = []
+    for mount, fstype in mounts:
+        st = stats.get(mount)
+        if st is None:
+            disks.append({"mount": mount, "fstype": fstype, "unresponsive": True, "warning": True})
+            continue
+        if isinstance(st, OSError) or st.f_blocks == 0:
+            # Permission denied, or an empty pseudo-filesystem df would hide too
+            continue
+        size = st.f_blocks * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        avail = st.f_bavail * st.f_frsize
+        # Same rounding as df: share of the space usable by non-root, rounded up
+        usable = used + avail
+        pct = -(-used * 100 // usable) if usable else 0
+        inodes_used = st.f_files - st.f_ffree
+        disks.append({
+            "mount": mount,
+            "fstype": fstype,
+            "size": _human(size),
+            "used": _human(used),
+            "avail": _human(avail),
+            "percent": pct,
+            "warning": pct > DISK_WARN_PERCENT,
+            "sizeBytes": size,
+            "usedBytes": used,
+            "availBytes": avail,
+            "inodes": {
+                "total": st.f_files,
+                "used": inodes_used,
+                "free": st.f_favail,
+                "percent": round(inodes_used * 100 / st.f_files, 1) if st.f_files else 0,
+            },
+        })
+    return disks
+
+
+def _cpu_times():
+    """Busy and total jiffies from /proc/stat: index 0 is all CPUs, then each core."""
+    ids, busy, total = array("i"), array("Q"), array("Q")
+    with open("/proc/stat", "rb") as f:
+        for line in f:
+            if not line.startswith(b"cpu"):
+                break
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal (guest is already in user)
+            values = [int(v) for v in fields[1:9]]
+            ids.append(int(fields[0][3:]) if len(fields[0]) > 3 else -1)
+            busy.append(sum(values) - values[3] - values[4])
+            total.append(sum(values))
+    return ids, busy, total
+
+
+def _disk_counters():
+    """Sectors read/written per whole disk (no partitions, loop or ram devices)."""
+    counters = {}
+    with open("/proc/diskstats", "rb") as f:
+        for line in f:
+            fields = line.split()
+            name = fields[2].decode()
+            if name.startswith(("loop", "ram", "zram")) or not os.path.isdir(f"/sys/block/{name}"):
+                continue
+            counters[name] = (int(fields[5]), int(fields[9]))
+    return counters
+
+
+def _pressure():
+    """PSI averages from /proc/pressure, or {} on kernels without it."""
+    pressure = {}
+    for resource in ("cpu", "memory", "io"):
+        try:
+            with open(f"/proc/pressure/{resource}") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        pressure[resource] = {}
+        for line in lines:
+            kind, *pairs = line.split()
+            stats = dict(p.split("=") for p in pairs)
+            pressure[resource][kind] = {k: float(stats[k]) for k in ("avg10", "avg60", "avg300")}
+    return pressure
+
+
+class _Proc:
+    """One process, reduced from its /proc/[pid]/stat line."""
+
+    __slots__ = ("pid", "name", "start", "ticks", "rss")
+
+    def __init__(self, pid, name, start, ticks, rss):
+        self.pid = pid
+        self.name = name  # raw bytes; decoded only for processes that get reported
+        self.start = start
+        self.ticks = ticks
+        self.rss = rss
+
+
+def _scan_procs():
+    """Every live process from one os.scandir pass over /proc.
+
+    Each process costs a single raw read of /proc/[pid]/stat, which has
+    CPU ticks and resident pages as well as the name, so statm is not
+    needed.
+    """
+    procs = []
+    # Paths are opened relative to /proc so the kernel doesn't re-walk it per process
+    proc_fd = os.open("/proc", os.O_RDONLY | os.O_DIRECTORY)
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-        return result.stdout.strip(), None
-    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-        return "", str(e)
+        with os.scandir(proc_fd) as it:
+            for entry in it:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    fd = os.open(entry.name + "/stat", os.O_RDONLY, dir_fd=proc_fd)
+                    try:
+                        data = os.read(fd, 1024)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    continue  # exited mid-scan
+                # The name is parenthesised and may itself contain spaces or ")"
+                lparen, rparen = data.find(b"("), data.rfind(b")")
+                rest = data[rparen + 2:].split(None, 22)
+                if len(rest) < 22:
+                    continue
+                # rest[0] is field 3 (state): utime/stime are 14/15, starttime 22, rss 24
+                procs.append(_Proc(
+                    int(entry.name), data[lparen + 1:rparen], int(rest[19]), int(rest[11]) + int(rest[12]), int(rest[21])
+                ))
+    finally:
+        os.close(proc_fd)
+    return procs
+
+
+def _top_processes(before, after, elapsed, n):
+    """Top ``n`` processes by resident memory and by CPU over the sample."""
+    page = os.sysconf("SC_PAGE_SIZE")
+    hz = os.sysconf("SC_CLK_TCK")
+    previous = {p.pid: (p.start, p.ticks) for p in before}
+
+    def cpu_ticks(p):
+        start, ticks = previous.get(p.pid, (p.start, 0))
+        # A reused pid is a new process: all of its ticks fall in the window
+        return p.ticks - ticks if start == p.start else p.ticks
+
+    by_rss = heapq.nlargest(n, after, key=lambda p: p.rss)
+    by_cpu = heapq.nlargest(n, ((cpu_ticks(p), p) for p in after), key=lambda item: item[0])
+    return {
+        "scanned": len(after),
+        "byMemory": [
+            {"pid": p.pid, "name": p.name.decode(errors="replace"), "rssBytes": p.rss * page, "rss": _human(p.rss * page)}
+            for p in by_rss
+        ],
+        "byCpu": [
+            {
+                "pid": p.pid,
+                "name": p.name.decode(errors="replace"),
+                "cpuPercent": round(100 * ticks / hz / elapsed, 1) if elapsed else 0.0,
+                "cpuSeconds": round(p.ticks / hz, 1),
+            }
+            for ticks, p in by_cpu
+        ],
+    }
+
+
+def _snapshot(procs=False):
+    return time.monotonic(), _cpu_times(), _disk_counters(), _scan_procs() if procs else None
+
+
+def _summarize_sample(before, after):
+    """CPU and disk I/O over the interval between two snapshots."""
+    t0, (ids, busy0, total0), disks0, _ = before
+    t1, (ids1, busy1, total1), disks1, _ = after
+    elapsed = t1 - t0
+
+    # Cores going offline mid-sample would shift the rows; compare only if they match
+    usage = array("d")
+    if ids == ids1:
+        for i in range(len(ids)):
+            dt = total1[i] - total0[i]
+            usage.append(100 * (busy1[i] - busy0[i]) / dt if dt else 0.0)
+    cpu = {"sampleSeconds": round(elapsed, 2)}
+    if usage:
+        cpu["percent"] = round(usage[0], 1)
+        cores = usage[1:]
+        if cores:
+            hot = [ids[i + 1] for i, u in enumerate(cores) if u >= HOT_CORE_PERCENT]
+            cpu["cores"] = {
+                "count": len(cores),
+                "min": round(min(cores), 1),
+                "median": round(statistics.median(cores), 1),
+                "max": round(max(cores), 1),
+                "hot": hot[:MAX_HOT_CORES],
+                "hotCount": len(hot),
+            }
+
+    disk_io = []
+    for name, (read1, written1) in sorted(disks1.items()):
+        if name not in disks0 or not elapsed:
+            continue
+        read0, written0 = disks0[name]
+        read_rate = (read1 - read0) * SECTOR_BYTES / elapsed
+        write_rate = (written1 - written0) * SECTOR_BYTES / elapsed
+        disk_io.append({
+            "device": name,
+            "readBytesPerSec": round(read_rate),
+            "writeBytesPerSec": round(write_rate),
+            "read": f"{_human(read_rate)}/s",
+            "write": f"{_human(write_rate)}/s",
+        })
+    return cpu, disk_io
 
 
 def get_system(args):
     info = {}
 
+    # The sample window opens first so the rest of the section (and the
+    # other sections, in their own threads) runs inside it
+    window = args.system_sample
+    if args.top > 0:
+        window = max(window, TOP_SAMPLE_SECONDS)
+    sample = None
+    if window > 0:
+        try:
+            sample = _snapshot(procs=args.top > 0)
+        except OSError:
+            pass
+
     # Uptime
     try:
         with open("/proc/uptime") as f:
@@ -62,32 +366,37 @@ def get_system(args):
             "used_gb": f"{used / 1e9:.1f}",
             "free_gb": f"{available / 1e9:.1f}",
             "percent": str(pct),
+            "totalBytes": total,
+            "usedBytes": used,
         }
     except OSError:
         info["memory"] = {"total_gb": "?", "used_gb": "?", "free_gb": "?", "percent": "?"}
 
     # Disk usage
-    out, err = _run(
-        ["df", "-h", "--output=target,size,used,avail,pcent", "-x", "tmpfs", "-x", "devtmpfs", "-x", "overlay"]
-    )
-    if not err and out:
-        lines = out.splitlines()[1:]  # skip header
-        disks = []
-        for line in lines:
-            if not line.strip():
-                continue
-            parts = line.split()
-            if len(parts) >= 5:
-                pct = int(parts[4].rstrip("%")) if parts[4].rstrip("%").isdigit() else 0
-                disks.append({
-                    "mount": parts[0],
-                    "size": parts[1],
-                    "used": parts[2],
-                    "avail": parts[3],
-                    "percent": pct,
-                    "warning": pct > 80,
-                })
+    try:
+        disks = _disk_usage(args.disk_timeout)
+    except OSError:
+        disks = None
+    if disks is not None:
         info["disks"] = disks
         info["diskWarnings"] = len([d for d in disks if d["warning"]])
+        info["unresponsiveMounts"] = len([d for d in disks if d.get("unresponsive")])
+
+    if sample is not None:
+        time.sleep(max(0.0, window - (time.monotonic() - sample[0])))
+        try:
+            after = _snapshot(procs=args.top > 0)
+            info["cpu"], info["diskIO"] = _summarize_sample(sample, after)
+        except OSError:
+            after = None
+        info["pressure"] = _pressure()
+        if after is not None and args.top > 0:
+            info["topProcesses"] = _top_processes(sample[3], after[3], after[0] - sample[0], args.top)
+
+    if not (args.no_history or args.no_cache):
+        try:
+            info["history"] = record_and_compare(info, info.get("pressure") or _pressure(), args.history_windows)
+        except (OSError, ValueError):
+            pass  # unwritable cache dir, or one on a filesystem without mmap
 
     return info
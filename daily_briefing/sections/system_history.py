@@ -0,0 +1,125 @@
+"""System metrics history — one fixed-width record per run, for trends.
+
+Records live in a memory-mapped ring buffer in the cache directory, so
+history never grows past HISTORY_CAPACITY runs and reading a week of it
+doesn't parse anything but the records in the window.
+"""
+
+import math
+import statistics
+import struct
+import time
+import zlib
+
+from ..cache import cache_dir
+from ..ringbuffer import RingBuffer
+
+HISTORY_FILE = "system-history.bin"
+HISTORY_CAPACITY = 20_160  # two weeks of runs every minute
+MAX_MOUNTS = 8  # mounts recorded per run; later ones (sorted by path) are dropped
+
+# time, load 1m/5m/15m, memory %, memory used bytes, PSI some avg10 for
+# cpu/memory/io, then per mount: crc32 of the path, used and usable bytes
+RECORD = struct.Struct("<d3ffQ3f4x" + "I4xQQ" * MAX_MOUNTS)
+NAN = float("nan")
+
+
+def _mount_id(mount):
+    return zlib.crc32(mount.encode()) or 1  # 0 marks an empty slot
+
+
+def _record(info, pressure, now):
+    """Pack the fields of a finished system section into a record tuple."""
+    load = info.get("load") or {}
+    memory = info.get("memory") or {}
+
+    def number(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return NAN
+
+    psi = [
+        (pressure.get(resource) or {}).get("some", {}).get("avg10", NAN)
+        for resource in ("cpu", "memory", "io")
+    ]
+    values = [now, number(load.get("1m")), number(load.get("5m")), number(load.get("15m")),
+              number(memory.get("percent")), memory.get("usedBytes", 0), *psi]
+    disks = [d for d in info.get("disks") or [] if "usedBytes" in d][:MAX_MOUNTS]
+    for d in disks:
+        values += [_mount_id(d["mount"]), d["usedBytes"], d["usedBytes"] + d["availBytes"]]
+    values += [0, 0, 0] * (MAX_MOUNTS - len(disks))
+    return values
+
+
+def _mount_usage(record):
+    """{mount id: (used, usable)} from a record's mount slots."""
+    slots = record[9:]
+    return {
+        slots[i]: (slots[i + 1], slots[i + 2])
+        for i in range(0, len(slots), 3)
+        if slots[i]
+    }
+
+
+def _median(values):
+    values = [v for v in values if not math.isnan(v)]
+    return statistics.median(values) if values else None
+
+
+def _trend(past, current, disks):
+    """Compare the current record with the records of one window."""
+    first = past[0]
+    trend = {"samples": len(past), "coveredSeconds": round(current[0] - first[0])}
+
+    load_median = _median(r[1] for r in past)
+    if load_median is not None and not math.isnan(current[1]):
+        trend["loadMedian"] = round(load_median, 2)
+        if load_median > 0:
+            trend["loadRatio"] = round(current[1] / load_median, 1)
+
+    if not math.isnan(current[4]) and not math.isnan(first[4]):
+        trend["memoryPercentDelta"] = round(current[4] - first[4], 1)
+
+    then, now = _mount_usage(first), _mount_usage(current)
+    trend["disks"] = []
+    for mount in disks:
+        key = _mount_id(mount)
+        if key not in then or key not in now or not then[key][1] or not now[key][1]:
+            continue
+        (used0, usable0), (used1, usable1) = then[key], now[key]
+        trend["disks"].append({
+            "mount": mount,
+            "percentDelta": round(100 * (used1 / usable1 - used0 / usable0), 1),
+            "usedBytesDelta": used1 - used0,
+        })
+
+    pressure = {}
+    for i, resource in enumerate(("cpu", "memory", "io")):
+        median = _median(r[6 + i] for r in past)
+        if median is not None:
+            pressure[resource] = round(median, 2)
+    if pressure:
+        trend["pressureMedian"] = pressure
+    return trend
+
+
+def record_and_compare(info, pressure, windows):
+    """Append this run to the history and compare it with each window.
+
+    ``windows`` is a list of ``(label, seconds)``. Runs inside a window are
+    read before this run is appended, so it is never compared with itself.
+    Returns ``{"samples": n, "windows": {label: trend}}``.
+    """
+    now = time.time()
+    current = _record(info, pressure, now)
+    disks = [d["mount"] for d in info.get("disks") or [] if "usedBytes" in d][:MAX_MOUNTS]
+    trends = {}
+    with RingBuffer(str(cache_dir() / HISTORY_FILE), RECORD, HISTORY_CAPACITY) as ring:
+        for label, seconds in windows:
+            past = ring.since(now - seconds)
+            if past:
+                trends[label] = _trend(past, current, disks)
+        ring.append(current)
+        samples = len(ring)
+    return {"samples": samples, "windows": trends}
@@ -1,17 +1,14 @@
 """Weather section — fetches current conditions from wttr.in."""
 
-import json
-import urllib.request
 import urllib.parse
 
+from ..runner import get_json
 
-def get_weather(args):
+
+async def get_weather(args):
     location = urllib.parse.quote(args.location)
     url = f"https://wttr.in/{location}?format=j1"
-    req = urllib.request.Request(url, headers={"User-Agent": "daily-briefing/2.0"})
-
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        data = json.loads(resp.read().decode())
+    data = await get_json(url, {"User-Agent": "daily-briefing/2.0"}, timeout=15)
 
     current = data.get("current_condition", [{}])[0]
     today = data.get("weather", [{}])[0]
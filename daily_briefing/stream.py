@@ -0,0 +1,74 @@
+"""Streaming output — print sections as soon as they finish."""
+
+import sys
+from datetime import datetime, timezone
+
+from .briefing import iter_briefing
+from .formatters import plain, terminal
+from .formatters.json_fmt import format_json_line
+
+CLEAR_BELOW = "\033[J"
+
+
+def _up(lines):
+    return f"\033[{lines}F" if lines else ""
+
+
+def _stream_ndjson(args, out):
+    timed_out = False
+    for name, data in iter_briefing(args):
+        timed_out = timed_out or bool(data.get("timedOut"))
+        out.write(format_json_line(name, data) + "\n")
+        out.flush()
+    return timed_out
+
+
+def _stream_text(args, out, fmt, live):
+    """Print sections in the usual order as soon as they and those before them are done.
+
+    With ``live`` (a terminal), the sections not printed yet are shown as
+    one-line placeholders underneath, redrawn as results come in. They stay
+    one line each so the redraw never has to move the cursor further up
+    than it can see.
+    """
+    keys = [k for k in fmt.SECTION_FORMATTERS if k in args.sections]
+    done = {}
+    printed = 0
+    drawn = 0
+    timed_out = False
+
+    def redraw():
+        nonlocal printed, drawn
+        text = _up(drawn) + CLEAR_BELOW if live else ""
+        while printed < len(keys) and keys[printed] in done:
+            key = keys[printed]
+            text += fmt.format_section(key, done[key]) + "\n"
+            printed += 1
+        drawn = 0
+        if live:
+            for key in keys[printed:]:
+                text += fmt.format_placeholder(key, ready=key in done) + "\n"
+                drawn += 1
+        out.write(text)
+        out.flush()
+
+    out.write(fmt.format_banner() + "\n")
+    redraw()
+    for name, data in iter_briefing(args):
+        timed_out = timed_out or bool(data.get("timedOut"))
+        if name in keys:
+            done[name] = data
+            redraw()
+    if hasattr(fmt, "format_footer"):
+        out.write(fmt.format_footer(datetime.now(timezone.utc).isoformat()) + "\n")
+        out.flush()
+    return timed_out
+
+
+def stream_briefing(args, out=sys.stdout):
+    """Write the briefing incrementally; returns True if any section timed out."""
+    if args.format == "json":
+        return _stream_ndjson(args, out)
+    if args.format == "plain":
+        return _stream_text(args, out, plain, live=False)
+    return _stream_text(args, out, terminal, live=out.isatty())
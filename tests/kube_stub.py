@@ -0,0 +1,156 @@
+"""In-process stand-in for a Kubernetes API server, shared by the kube tests."""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def pod(i, phase="Running", restarts=0, version=None):
+    meta = {"name": f"pod-{i}", "namespace": f"ns-{i % 3}"}
+    if version is not None:
+        meta["resourceVersion"] = str(version)
+    return {
+        "metadata": meta,
+        "status": {"phase": phase, "containerStatuses": [{"name": "c", "restartCount": restarts}]},
+    }
+
+
+def node(name, ready=True):
+    return {
+        "metadata": {"name": name, "labels": {"node-role.kubernetes.io/worker": ""}},
+        "status": {"conditions": [{"type": "Ready", "status": "True" if ready else "False"}]},
+    }
+
+
+class StubServer:
+    """Serves LISTs of ``pods``/``nodes`` in pages and replays ``events`` on watch.
+
+    ``resource_version`` is reported on every LIST; a watch from a version
+    older than ``compacted`` answers with a 410 ERROR event. Requests are
+    recorded in ``requests`` as (path, query) pairs. ``/slow`` trickles a
+    body one byte every ``slow_interval`` seconds, and requests for paths
+    in ``hang`` are never answered.
+    """
+
+    def __init__(self, pods=(), nodes=(), events=(), resource_version=100, compacted=0):
+        self.pods = list(pods)
+        self.nodes = list(nodes)
+        self.events = list(events)
+        self.resource_version = resource_version
+        self.compacted = compacted
+        self.slow_interval = 0.2
+        self.hang = set()
+        self._closed = threading.Event()
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.requests.append((url.path, query))
+                if url.path in stub.hang:
+                    stub._closed.wait()
+                    return
+                if url.path == "/slow":
+                    return stub._slow(self)
+                if query.get("watch"):
+                    return stub._watch(self, url.path, query)
+                return stub._list(self, url.path, query)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._closed.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _items(self, path):
+        return {"/api/v1/pods": self.pods, "/api/v1/nodes": self.nodes}.get(path)
+
+    def _list(self, handler, path, query):
+        items = self._items(path)
+        if items is None:
+            return self._send(handler, 404, {"kind": "Status", "message": "not found"})
+        limit = int(query.get("limit", len(items) or 1))
+        start = int(query.get("continue", 0))
+        meta = {"resourceVersion": str(self.resource_version)}
+        if start + limit < len(items):
+            meta["continue"] = str(start + limit)
+        body = {"metadata": meta, "items": items[start:start + limit]}
+        gzipped = "gzip" in handler.headers.get("Accept-Encoding", "")
+        self._send(handler, 200, body, gzipped)
+
+    def _send(self, handler, status, body, gzipped=False):
+        data = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        if gzipped:
+            data = gzip.compress(data)
+            handler.send_header("Content-Encoding", "gzip")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _watch(self, handler, path, query):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def chunk(event):
+            data = json.dumps(event).encode() + b"\n"
+            handler.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            handler.wfile.flush()
+
+        since = int(query["resourceVersion"])
+        if since < self.compacted:
+            chunk({"type": "ERROR", "object": {"kind": "Status", "code": 410, "message": "too old resource version"}})
+        else:
+            for version, kind, obj, resource in self.events:
+                if resource == path and version > since:
+                    chunk({"type": kind, "object": obj})
+        # Leave the watch open; the client ends it after its idle timeout
+        time.sleep(float(query.get("timeoutSeconds", 1)))
+        try:
+            handler.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+
+    def _slow(self, handler):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", "1000")
+        handler.end_headers()
+        try:
+            for _ in range(1000):
+                handler.wfile.write(b" ")
+                handler.wfile.flush()
+                time.sleep(self.slow_interval)
+        except OSError:
+            pass
+
+
+def client_config(server):
+    """A resolved config as load_kubeconfig returns it, pointing at ``server``."""
+    return {
+        "context": "stub",
+        "server": server.url,
+        "insecure": False,
+        "ca": None,
+        "cert": None,
+        "key": None,
+        "token": "stub-token",
+        "basic": None,
+    }
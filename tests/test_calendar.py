@@ -0,0 +1,135 @@
+"""Tests for the batched Google Calendar sync in daily_briefing.sections.calendar."""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from daily_briefing.cache import load_json
+from daily_briefing.sections import calendar
+
+BOUNDARY = "batch_boundary"
+CALENDARS = [{"id": "a@example.com", "name": "A"}, {"id": "b@example.com", "name": "B"}]
+
+
+def _event(event_id, start, hours=1, **extra):
+    return dict({
+        "id": event_id,
+        "summary": event_id,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat()},
+    }, **extra)
+
+
+def _batch(*responses):
+    """One multipart batch response; ``responses`` are ``(request_id, status, body)``."""
+    parts = []
+    for request_id, status, body in responses:
+        parts.append(
+            f"--{BOUNDARY}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-x + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(body)}\r\n"
+        )
+    headers = {"status": "200", "content-type": f"multipart/mixed; boundary={BOUNDARY}"}
+    return headers, "".join(parts) + f"--{BOUNDARY}--"
+
+
+def _gone():
+    return {"error": {"code": 410, "message": "Sync token is no longer valid"}}
+
+
+class SyncCalendarsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.dict(os.environ, {"BRIEFING_CACHE_DIR": self.tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.start = datetime.combine(datetime.now().date(), datetime.min.time()).astimezone()
+        self.end = self.start + timedelta(days=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sync(self, *responses, calendars=CALENDARS):
+        http = HttpMockSequence(list(responses))
+        service = build("calendar", "v3", http=http, static_discovery=True)
+        stores = dict((cal["id"], store) for cal, store in
+                      calendar._sync_calendars(service, calendars, self.start, self.end))
+        # Inner requests of each batch, as they appear in the multipart bodies
+        requests = [body for _, _, body, _ in http.request_sequence]
+        return stores, requests
+
+    def test_calendars_are_fetched_in_one_batch(self):
+        morning = self.start + timedelta(hours=9)
+        stores, requests = self._sync(_batch(
+            ("0", 200, {"items": [_event("standup", morning)], "nextSyncToken": "tok-a"}),
+            ("1", 200, {"items": [_event("lunch", morning + timedelta(hours=3))], "nextSyncToken": "tok-b"}),
+        ))
+        self.assertEqual(len(requests), 1)
+        self.assertIn("timeMin=", requests[0])
+        self.assertEqual(set(stores["a@example.com"]["events"]), {"standup"})
+        self.assertEqual(stores["b@example.com"]["syncToken"], "tok-b")
+        self.assertEqual(load_json(calendar._store_file("a@example.com"))["syncToken"], "tok-a")
+
+    def test_next_page_goes_out_in_a_follow_up_batch(self):
+        morning = self.start + timedelta(hours=9)
+        stores, requests = self._sync(
+            _batch(("0", 200, {"items": [_event("one", morning)], "nextPageToken": "page-2"})),
+            _batch(("0", 200, {"items": [_event("two", morning)], "nextSyncToken": "tok-a"})),
+            calendars=CALENDARS[:1],
+        )
+        self.assertIn("pageToken=page-2", requests[1])
+        self.assertEqual(set(stores["a@example.com"]["events"]), {"one", "two"})
+
+    def test_sync_token_is_reused_and_changes_applied(self):
+        morning = self.start + timedelta(hours=9)
+        self._sync(_batch(
+            ("0", 200, {"items": [_event("standup", morning), _event("review", morning)], "nextSyncToken": "tok-a"}),
+            ("1", 200, {"items": [], "nextSyncToken": "tok-b"}),
+        ))
+        stores, requests = self._sync(_batch(
+            ("0", 200, {"items": [{"id": "review", "status": "cancelled"}], "nextSyncToken": "tok-a2"}),
+            ("1", 200, {"items": [], "nextSyncToken": "tok-b2"}),
+        ))
+        self.assertIn("syncToken=tok-a", requests[0])
+        self.assertIn("syncToken=tok-b", requests[0])
+        self.assertNotIn("timeMin=", requests[0])
+        self.assertEqual(set(stores["a@example.com"]["events"]), {"standup"})
+        self.assertEqual(stores["a@example.com"]["syncToken"], "tok-a2")
+
+    def test_expired_sync_token_falls_back_to_full_sync(self):
+        morning = self.start + timedelta(hours=9)
+        self._sync(_batch(
+            ("0", 200, {"items": [_event("stale", morning)], "nextSyncToken": "tok-a"}),
+            ("1", 200, {"items": [], "nextSyncToken": "tok-b"}),
+        ))
+        stores, requests = self._sync(
+            _batch(("0", 410, _gone()), ("1", 200, {"items": [], "nextSyncToken": "tok-b2"})),
+            _batch(("0", 200, {"items": [_event("fresh", morning)], "nextSyncToken": "tok-a2"})),
+        )
+        self.assertEqual(len(requests), 2)
+        self.assertIn("timeMin=", requests[1])
+        self.assertNotIn("syncToken=", requests[1])
+        self.assertEqual(set(stores["a@example.com"]["events"]), {"fresh"})
+        self.assertEqual(stores["a@example.com"]["syncToken"], "tok-a2")
+
+    def test_inaccessible_calendar_is_skipped(self):
+        stores, requests = self._sync(_batch(
+            ("0", 404, {"error": {"code": 404, "message": "Not Found"}}),
+            ("1", 200, {"items": [], "nextSyncToken": "tok-b"}),
+        ))
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(list(stores), ["b@example.com"])
+        self.assertIsNone(load_json(calendar._store_file("a@example.com")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for recurring-event expansion in daily_briefing.sections.ics."""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from daily_briefing.sections.ics import ics_events
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def _calendar(*event_lines):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "BEGIN:VEVENT", *event_lines, "END:VEVENT", "END:VCALENDAR"]
+    return "\r\n".join(lines) + "\r\n"
+
+
+class ExpandUntilTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cal.ics")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _starts(self, text, start, days):
+        with open(self.path, "w") as f:
+            f.write(text)
+        events = ics_events(self.path, start, start + timedelta(days=days), use_cache=False)
+        return [datetime.fromisoformat(e["start"]["dateTime"]) for e in events]
+
+    def test_utc_until_includes_last_occurrence_east_of_utc(self):
+        # 07:00Z on the 20th is 09:00 in Berlin, exactly the last occurrence
+        text = _calendar(
+            "UID:standup",
+            "SUMMARY:Standup",
+            "DTSTART;TZID=Europe/Berlin:20261015T090000",
+            "DTEND;TZID=Europe/Berlin:20261015T091500",
+            "RRULE:FREQ=DAILY;UNTIL=20261020T070000Z",
+        )
+        starts = self._starts(text, datetime(2026, 10, 18, tzinfo=BERLIN), days=5)
+        self.assertEqual([s.day for s in starts], [18, 19, 20])
+        self.assertEqual(starts[-1], datetime(2026, 10, 20, 9, tzinfo=BERLIN))
+
+    def test_utc_until_excludes_later_occurrences_west_of_utc(self):
+        # 12:59:59Z on the 20th is 08:59:59 in New York, just before that day's occurrence
+        new_york = ZoneInfo("America/New_York")
+        text = _calendar(
+            "UID:sync",
+            "SUMMARY:Sync",
+            "DTSTART;TZID=America/New_York:20261015T090000",
+            "DURATION:PT30M",
+            "RRULE:FREQ=DAILY;UNTIL=20261020T125959Z",
+        )
+        starts = self._starts(text, datetime(2026, 10, 18, tzinfo=new_york), days=5)
+        self.assertEqual([s.day for s in starts], [18, 19])
+
+
+if __name__ == "__main__":
+    unittest.main()
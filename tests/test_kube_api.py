@@ -0,0 +1,127 @@
+"""Tests for the built-in Kubernetes client in daily_briefing.sections.kube_api."""
+
+import base64
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from daily_briefing.sections import kube_api
+from daily_briefing.sections.kube_api import KubeClient, KubeConfigError, load_kubeconfig
+
+from kube_stub import StubServer, client_config, pod
+
+
+class ListPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(pods=[pod(i) for i in range(7)])
+        self.client = KubeClient(client_config(self.server), timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_follows_continue_until_the_last_page(self):
+        pages = list(self.client.list_pages("/api/v1/pods", limit=3))
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        names = [p["metadata"]["name"] for page in pages for p in page]
+        self.assertEqual(names, [f"pod-{i}" for i in range(7)])
+        tokens = [query.get("continue") for _, query in self.server.requests]
+        self.assertEqual(tokens, [None, "3", "6"])
+
+    def test_gzip_body_is_decompressed(self):
+        page = self.client.get_json("/api/v1/pods")
+        self.assertEqual(len(page["items"]), 7)
+        self.assertEqual(page["metadata"]["resourceVersion"], "100")
+
+    def test_error_status_raises_kube_api_error(self):
+        with self.assertRaises(kube_api.KubeAPIError) as cm:
+            self.client.get_json("/api/v1/secrets")
+        self.assertEqual(cm.exception.status, 404)
+
+    def test_bearer_token_is_sent(self):
+        self.assertEqual(self.client.headers["Authorization"], "Bearer stub-token")
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_trickling_body_is_cut_off_at_the_timeout(self):
+        server = StubServer()
+        server.slow_interval = 0.1  # always faster than any per-read timeout
+        client = KubeClient(client_config(server), timeout=1)
+        try:
+            start = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                client.get_json("/slow")
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertIsNone(client._conn)
+        finally:
+            client.close()
+            server.close()
+
+
+class LoadKubeconfigTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        with open(os.path.join(self.dir, "token"), "w") as f:
+            f.write("file-token\n")
+        self.config = {
+            "current-context": "dev",
+            "contexts": [
+                {"name": "dev", "context": {"cluster": "c1", "user": "u1"}},
+                {"name": "prod", "context": {"cluster": "c2", "user": "u2"}},
+            ],
+            "clusters": [
+                {"name": "c1", "cluster": {"server": "https://dev.example:6443/"}},
+                {
+                    "name": "c2",
+                    "cluster": {
+                        "server": "https://prod.example",
+                        "certificate-authority-data": base64.b64encode(b"CA PEM").decode(),
+                    },
+                },
+            ],
+            "users": [
+                {"name": "u1", "user": {"tokenFile": "token"}},
+                {"name": "u2", "user": {"username": "admin", "password": "secret"}},
+            ],
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _load(self, context=None):
+        path = os.path.join(self.dir, "config")
+        with open(path, "w") as f:
+            json.dump(self.config, f)
+        missing = os.path.join(self.dir, "missing")
+        with mock.patch.dict(os.environ, {"KUBECONFIG": os.pathsep.join([missing, path])}):
+            return load_kubeconfig(context)
+
+    def test_current_context_with_relative_token_file(self):
+        resolved = self._load()
+        self.assertEqual(resolved["context"], "dev")
+        self.assertEqual(resolved["server"], "https://dev.example:6443")
+        self.assertEqual(resolved["token"], "file-token")
+        self.assertIsNone(resolved["ca"])
+
+    def test_named_context_with_ca_data_and_basic_auth(self):
+        resolved = self._load("prod")
+        self.assertEqual(resolved["ca"], b"CA PEM")
+        self.assertEqual(resolved["basic"], ("admin", "secret"))
+        self.assertIsNone(resolved["token"])
+
+    def test_unknown_context(self):
+        with self.assertRaises(KubeConfigError):
+            self._load("staging")
+
+    def test_auth_provider_is_rejected(self):
+        self.config["users"][0]["user"] = {"auth-provider": {"name": "gcp"}}
+        with self.assertRaises(KubeConfigError):
+            self._load()
+
+
+if __name__ == "__main__":
+    unittest.main()
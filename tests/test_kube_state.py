@@ -0,0 +1,104 @@
+"""Tests for the incremental --kube-cache state in daily_briefing.sections.kube_state."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from daily_briefing.sections import kube_state, kubernetes
+from daily_briefing.sections.kube_api import KubeClient
+
+from kube_stub import StubServer, client_config, node, pod
+
+PODS = "/api/v1/pods"
+project, key = kubernetes._project_pod, kubernetes.CACHED_RESOURCES["pods"][2]
+
+
+def _state(pods, version):
+    return {"resourceVersion": str(version), "items": {key(project(p)): project(p) for p in pods}}
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            (101, "MODIFIED", pod(1, phase="Failed", version=101), PODS),
+            (102, "DELETED", pod(2, version=102), PODS),
+            (103, "ADDED", pod(9, version=103), PODS),
+        ]
+        self.server = StubServer(pods=[pod(0), pod(1), pod(2)], events=self.events, resource_version=103)
+        self.client = KubeClient(client_config(self.server), timeout=10)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def _sync(self, state):
+        return kube_state.sync(self.client, PODS, project, key, state, seconds=5)
+
+    def test_catches_up_from_stored_resource_version(self):
+        state, how = self._sync(_state([pod(0), pod(1), pod(2)], 100))
+        self.assertEqual(how, "watch (3 changes)")
+        self.assertEqual(state["resourceVersion"], "103")
+        self.assertEqual(sorted(state["items"]), ["ns-0/pod-0", "ns-0/pod-9", "ns-1/pod-1"])
+        self.assertEqual(state["items"]["ns-1/pod-1"][2], "Failed")
+        (path, query), = self.server.requests
+        self.assertEqual(query["watch"], "true")
+        self.assertEqual(query["resourceVersion"], "100")
+
+    def test_only_events_after_the_stored_version_apply(self):
+        state, how = self._sync(_state([pod(0), pod(1, phase="Failed"), pod(9)], 102))
+        self.assertEqual(how, "watch (1 change)")
+        self.assertEqual(len(state["items"]), 3)
+
+    def test_expired_resource_version_falls_back_to_list(self):
+        self.server.compacted = 200
+        state, how = self._sync(_state([pod(5)], 100))
+        self.assertEqual(how, "list")
+        self.assertEqual(state["resourceVersion"], "103")
+        self.assertEqual(sorted(state["items"]), ["ns-0/pod-0", "ns-1/pod-1", "ns-2/pod-2"])
+        self.assertEqual([q.get("watch") for _, q in self.server.requests], ["true", None])
+
+    def test_no_state_lists(self):
+        state, how = self._sync(None)
+        self.assertEqual(how, "list")
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class FromStateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.dict(os.environ, {"BRIEFING_CACHE_DIR": self.tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server = StubServer(pods=[pod(0), pod(1)], nodes=[node("n1")])
+        self.config = client_config(self.server)
+
+    def tearDown(self):
+        self.server.close()
+        self.tmp.cleanup()
+
+    def _query(self, timeout=5):
+        make = lambda: KubeClient(self.config, timeout=timeout)
+        return kubernetes._from_state_cache(make, "stub", "api", timeout)
+
+    def test_second_run_catches_up_instead_of_listing(self):
+        first = self._query()
+        self.assertEqual(first["cache"], {"pods": "list", "nodes": "list"})
+        self.server.events.append((101, "ADDED", pod(7, version=101), PODS))
+        second = self._query()
+        self.assertEqual(second["cache"]["pods"], "watch (1 change)")
+        self.assertEqual(second["totalPods"], 3)
+        self.assertEqual(second["nodeCount"], 1)
+
+    def test_hung_node_sync_is_abandoned_at_the_timeout(self):
+        self.server.hang.add("/api/v1/nodes")
+        start = time.monotonic()
+        info = self._query(timeout=1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(info["totalPods"], 2)
+        self.assertNotIn("nodes", info["cache"])
+
+
+if __name__ == "__main__":
+    unittest.main()
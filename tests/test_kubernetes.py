@@ -0,0 +1,41 @@
+"""Tests for the Kubernetes section's API path in daily_briefing.sections.kubernetes."""
+
+import time
+import unittest
+
+from daily_briefing.sections import kubernetes
+
+from kube_stub import StubServer, client_config, node, pod
+
+
+class FromApiTest(unittest.TestCase):
+    def setUp(self):
+        pods = [pod(0), pod(1, phase="Pending"), pod(2, restarts=9)]
+        self.server = StubServer(pods=pods, nodes=[node("n1"), node("n2", ready=False)])
+        self.config = client_config(self.server)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_pods_and_nodes(self):
+        info = kubernetes._from_api(self.config, timeout=5)
+        self.assertEqual(info["source"], "api")
+        self.assertEqual(info["totalPods"], 3)
+        self.assertEqual(info["unhealthyCount"], 1)
+        self.assertEqual(info["restartIssueCount"], 1)
+        self.assertEqual(info["nodeCount"], 2)
+        self.assertEqual(info["nodesReady"], 1)
+
+    def test_hung_node_query_is_abandoned_at_the_timeout(self):
+        self.server.hang.add("/api/v1/nodes")
+        start = time.monotonic()
+        info = kubernetes._from_api(self.config, timeout=1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(info["totalPods"], 3)
+        self.assertNotIn("nodeCount", info)
+        self.assertTrue(info["available"])
+        self.assertNotIn("error", info)
+
+
+if __name__ == "__main__":
+    unittest.main()
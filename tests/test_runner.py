@@ -0,0 +1,171 @@
+"""Tests for daily_briefing.runner: child-process ownership and the HTTP client."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from daily_briefing import runner
+
+
+def _serve_once(body, chunks, pause=0.05):
+    """Serve one HTTP/1.0 response, writing ``body`` in ``chunks`` pieces."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def handle():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(b"HTTP/1.0 200 OK\r\nContent-Type: application/json\r\n\r\n")
+            step = -(-len(body) // chunks)
+            for i in range(0, len(body), step):
+                conn.sendall(body[i:i + step])
+                time.sleep(pause)
+        server.close()
+
+    threading.Thread(target=handle, daemon=True).start()
+    return f"http://127.0.0.1:{server.getsockname()[1]}/x?format=j1"
+
+
+def _serve(routes):
+    """Serve ``routes`` (path -> (status, headers, body)); returns the server and requested paths."""
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            seen.append(self.path)
+            status, headers, body = routes.get(self.path, (404, {}, b""))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, seen
+
+
+def _proxy_env(proxy, no_proxy=""):
+    env = {"http_proxy": proxy, "HTTP_PROXY": proxy, "no_proxy": no_proxy, "NO_PROXY": no_proxy}
+    return mock.patch.dict(os.environ, env)
+
+
+class GetJsonTest(unittest.TestCase):
+    def test_body_sent_in_several_writes_is_read_to_eof(self):
+        payload = {"data": "x" * 200_000}
+        url = _serve_once(json.dumps(payload).encode(), chunks=4)
+        self.assertEqual(asyncio.run(runner.get_json(url, timeout=5)), payload)
+
+    def test_oversized_body_is_rejected(self):
+        url = _serve_once(b"[" + b"0," * 600 + b"0]", chunks=2)
+        limit = runner.HTTP_LIMIT
+        runner.HTTP_LIMIT = 1000
+        try:
+            with self.assertRaises(OSError):
+                asyncio.run(runner.get_json(url, timeout=5))
+        finally:
+            runner.HTTP_LIMIT = limit
+
+    def test_redirect_is_followed(self):
+        server, seen = _serve({
+            "/old": (302, {"Location": "/new"}, b""),
+            "/new": (200, {"Content-Type": "application/json"}, b'{"moved": true}'),
+        })
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/old"
+            self.assertEqual(asyncio.run(runner.get_json(url, timeout=5)), {"moved": True})
+            self.assertEqual(seen, ["/old", "/new"])
+        finally:
+            server.shutdown()
+
+    def test_error_status_raises(self):
+        server, _ = _serve({})
+        try:
+            with self.assertRaisesRegex(OSError, "HTTP 404"):
+                asyncio.run(runner.get_json(f"http://127.0.0.1:{server.server_address[1]}/x", timeout=5))
+        finally:
+            server.shutdown()
+
+    def test_request_goes_through_http_proxy(self):
+        proxy, seen = _serve({"http://wttr.example/x?format=j1": (200, {}, b'{"via": "proxy"}')})
+        try:
+            with _proxy_env(f"http://127.0.0.1:{proxy.server_address[1]}"):
+                data = asyncio.run(runner.get_json("http://wttr.example/x?format=j1", timeout=5))
+            self.assertEqual(data, {"via": "proxy"})
+            self.assertEqual(seen, ["http://wttr.example/x?format=j1"])
+        finally:
+            proxy.shutdown()
+
+    def test_no_proxy_hosts_are_reached_directly(self):
+        proxy, proxied = _serve({})
+        server, seen = _serve({"/x": (200, {}, b'{"via": "direct"}')})
+        try:
+            with _proxy_env(f"http://127.0.0.1:{proxy.server_address[1]}", no_proxy="127.0.0.1"):
+                url = f"http://127.0.0.1:{server.server_address[1]}/x"
+                self.assertEqual(asyncio.run(runner.get_json(url, timeout=5)), {"via": "direct"})
+            self.assertEqual((proxied, seen), ([], ["/x"]))
+        finally:
+            proxy.shutdown()
+            server.shutdown()
+
+
+class AbandonChildrenTest(unittest.TestCase):
+    def _start(self, owner, cmd, results):
+        def work():
+            runner.own_children(owner)
+            # Children of the section's worker threads belong to it too
+            worker = threading.Thread(target=runner.carry_children(lambda: results.append(runner.run(cmd, timeout=30))))
+            worker.start()
+            worker.join()
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        return thread
+
+    def test_running_children_are_killed(self):
+        owner, other = threading.Event(), threading.Event()
+        mine, theirs = [], []
+        thread = self._start(owner, ["sleep", "30"], mine)
+        bystander = self._start(other, ["sleep", "1"], theirs)
+        time.sleep(0.3)
+        start = time.monotonic()
+        runner.abandon_children(owner)
+        thread.join(5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(mine[0][0], "")
+        bystander.join(5)
+        self.assertEqual(theirs, [("", None)])
+
+    def test_no_new_children_once_abandoned(self):
+        owner = threading.Event()
+        runner.abandon_children(owner)
+        results = []
+        self._start(owner, ["true"], results).join(5)
+        self.assertEqual(results, [("", runner.TIMED_OUT)])
+
+    def test_tracked_child_of_abandoned_owner_is_killed(self):
+        owner = threading.Event()
+        runner.abandon_children(owner)
+        runner.own_children(owner)
+        try:
+            with subprocess.Popen(["sleep", "30"]) as proc, runner.tracked(proc):
+                self.assertEqual(proc.wait(5), -9)
+        finally:
+            runner.own_children(None)
+
+
+if __name__ == "__main__":
+    unittest.main()